@@ -0,0 +1,69 @@
+import concurrent.futures
+import time
+from utils.fetch_engine import SharedBudget, configure_engine
+from .orchestrator import LetterboxdAnalysis, MultiYearAnalysis
+
+
+def _init_worker(budget: SharedBudget, max_in_flight: int, requests_per_second: float):
+    """Point the worker's fetch engine at the budget shared by the whole batch."""
+    configure_engine(max_in_flight=max_in_flight, requests_per_second=requests_per_second, budget=budget)
+
+
+def _run_user(user: str, years: list, force_refresh: bool, incremental: bool, defer_watchers: bool, trace: bool) -> dict:
+    start = time.perf_counter()
+    try:
+        if len(years) == 1:
+            analysis = LetterboxdAnalysis(user, years[0], trace=trace)
+        else:
+            analysis = MultiYearAnalysis(user, years, trace=trace)
+        analysis.run(force_refresh=force_refresh, incremental=incremental, defer_watchers=defer_watchers)
+        return {"user": user, "ok": True, "error": None, "seconds": time.perf_counter() - start}
+    except Exception as e:
+        return {"user": user, "ok": False, "error": str(e), "seconds": time.perf_counter() - start}
+
+
+class BatchAnalysis:
+    """Runs the pipeline for many users across a process pool.
+
+    Every worker shares one request budget (see `SharedBudget`) and the on-disk
+    film store, so adding workers speeds up the CPU-bound stages without
+    multiplying the load on Letterboxd.
+    """
+
+    def __init__(self, users: list, years: list, workers: int = 4, max_in_flight: int = 8, requests_per_second: float = 8.0, trace: bool = False):
+        self.users = users
+        self.years = years
+        self.workers = workers
+        self.max_in_flight = max_in_flight
+        self.requests_per_second = requests_per_second
+        self.trace = trace
+        self.results = []
+
+    def run(self, force_refresh: bool = False, summary_only: bool = False, incremental: bool = False, defer_watchers: bool = False):
+        budget = SharedBudget(self.max_in_flight, self.requests_per_second)
+
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=min(self.workers, len(self.users)),
+            initializer=_init_worker,
+            initargs=(budget, self.max_in_flight, self.requests_per_second),
+        ) as executor:
+            futures = [
+                executor.submit(_run_user, user, self.years, force_refresh, incremental, defer_watchers, self.trace)
+                for user in self.users
+            ]
+            for future in concurrent.futures.as_completed(futures):
+                self.results.append(future.result())
+
+        self.print_results()
+        return self.results
+
+    def print_results(self):
+        print("\n===== Batch Summary =====")
+        for result in sorted(self.results, key=lambda r: r["user"]):
+            if result["ok"]:
+                print(f"  {result['user']}: ok ({result['seconds']:.1f}s)")
+            else:
+                print(f"  {result['user']}: FAILED after {result['seconds']:.1f}s - {result['error']}")
+
+        failed = sum(1 for r in self.results if not r["ok"])
+        print(f"{len(self.results) - failed} succeeded, {failed} failed")
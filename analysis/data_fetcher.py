@@ -1,7 +1,8 @@
 import concurrent.futures
 from letterboxdpy.user import User
-from utils.data_access import DataAccess
-from datetime import date
+from utils.data_access import get_data_access
+from utils.fetch_engine import FetchEngine, get_engine
+from datetime import date, datetime, timedelta
 
 class DiaryFetcher:
     """Fetches a user’s diary data for a given year (in parallel)."""
@@ -11,13 +12,18 @@ class DiaryFetcher:
         "July","August","September","October","November","December"
     ]
 
-    def __init__(self, username: str, year: int, trace: bool = True, force_refresh = False):
+    # A month keeps being re-fetched until it has been synced this many days after it ended
+    settle_days = 7
+
+    def __init__(self, username: str, year: int, trace: bool = True, force_refresh = False, engine: FetchEngine | None = None, user_instance: User | None = None):
         self.username = username
         self.year = year
         self.trace = trace
         self.diary_data = {}
-        self.data_access = DataAccess()
-        self.user_instance = User(username) if force_refresh == True else None
+        self.data_access = get_data_access()
+        self.engine = engine or get_engine()
+        # A caller running several years can pass one shared User session
+        self.user_instance = user_instance or (User(username) if force_refresh == True else None)
         
 
     def _fetch_month(self, month_index: int, force_refresh = False) -> tuple:
@@ -33,7 +39,7 @@ class DiaryFetcher:
             except Exception as e:
                 if self.trace:
                     print(f"Error fetching month {month_index}: {e}")
-                return self.MONTHS[month_index - 1], {"count": 0, "entries": {}}
+                return self.MONTHS[month_index - 1], None
         else:
             try:
                 # Load the cached full diary file and extract the requested month
@@ -48,32 +54,77 @@ class DiaryFetcher:
                     print(f"Error fetching month {month_index}: {e}")
                 return self.MONTHS[month_index - 1], {"count": 0, "entries": {}}
 
-    def fetch(self, force_refresh=False):
+    def _month_end(self, month_index: int) -> date:
+        if month_index == 12:
+            return date(self.year, 12, 31)
+        return date(self.year, month_index + 1, 1) - timedelta(days=1)
+
+    def _months_to_sync(self, watermarks: dict, today: date) -> list:
+        """Pick the months an incremental sync has to fetch.
+
+        Future months are skipped, unseen months are always fetched, and a month
+        is refetched until one sync happened `settle_days` after it ended (so the
+        current month and recently edited previous months stay fresh).
+        """
+        months = []
+        for i in range(12):
+            month_index = i + 1
+            if date(self.year, month_index, 1) > today:
+                continue
+
+            mark = watermarks.get(self.MONTHS[i])
+            if mark is None:
+                months.append(month_index)
+                continue
+
+            synced_at = datetime.fromisoformat(mark["synced_at"]).date()
+            if synced_at <= self._month_end(month_index) + timedelta(days=self.settle_days):
+                months.append(month_index)
+        return months
+
+    def fetch(self, force_refresh=False, incremental=False):
         filename = f"diary_data_{self.username}_{self.year}.json"
+        sync_filename = f"diary_sync_{self.username}_{self.year}.json"
 
         # Try cache first
-        if not force_refresh:
+        if not force_refresh and not incremental:
             cached = self.data_access.load_json(self.username, self.year, filename)
-            if cached:
+            # An empty diary is a valid cache too (a year with no entries), not a miss
+            if cached is not None:
                 self.diary_data = cached
                 if self.trace:
                     print(f"Loaded cached diary data for {self.username} {self.year}")
                 return self.diary_data
 
-        # Fetch all 12 months concurrently
-        # If force_refresh is requested, create a User instance so threads can call the API
-        if force_refresh and self.user_instance is None:
+        # Incremental sync starts from the cached diary and only refetches stale months
+        watermarks = {}
+        months = list(range(1, 13))
+        if incremental:
+            watermarks = self.data_access.load_json(self.username, self.year, sync_filename) or {}
+            self.diary_data = self.data_access.load_json(self.username, self.year, filename) or {}
+            months = self._months_to_sync(watermarks, date.today())
+            if self.trace:
+                print(f"Incremental sync for {self.username} {self.year}: fetching {[self.MONTHS[m - 1] for m in months]}")
+
+        # Fetch the months concurrently through the shared fetch engine
+        # If a refresh is requested, create a User instance so threads can call the API
+        if (force_refresh or incremental) and self.user_instance is None and months:
             self.user_instance = User(self.username)
 
-        with concurrent.futures.ThreadPoolExecutor(max_workers=6) as executor:
-            futures = [executor.submit(self._fetch_month, i + 1, force_refresh) for i in range(12)]
-            for future in concurrent.futures.as_completed(futures):
-                result = future.result()
-                if result is None:
-                    # Defensive: ensure we don't crash if a worker returned None
-                    continue
-                month_name, data = result
-                self.diary_data[month_name] = data
+        synced_at = datetime.now().isoformat(timespec="seconds")
+        futures = [self.engine.submit(self._fetch_month, i, force_refresh or incremental, stage="diary") for i in months]
+        for future in concurrent.futures.as_completed(futures):
+            result = future.result()
+            if result is None:
+                # Defensive: ensure we don't crash if a worker returned None
+                continue
+            month_name, data = result
+            if data is None:
+                # Failed fetch: keep whatever the cache had for this month
+                self.diary_data.setdefault(month_name, {"count": 0, "entries": {}})
+                continue
+            self.diary_data[month_name] = data
+            watermarks[month_name] = {"synced_at": synced_at, "count": data.get("count", 0)}
 
         # Create a list of entries with their dates for sorting
         all_entries = []
@@ -97,6 +148,8 @@ class DiaryFetcher:
 
         self.diary_data = sorted_data
         self.data_access.save_json(self.username, self.year, filename, self.diary_data)
+        if force_refresh or incremental:
+            self.data_access.save_json(self.username, self.year, sync_filename, watermarks)
         if self.trace:
             print(f"Saved full diary data to cache for {self.username} {self.year}")
         return self.diary_data
@@ -0,0 +1,616 @@
+"""Registry of the stats keys, each computed on its own from shared folds.
+
+A metric is a function `(calc, min_runtime) -> value` registered under its
+stats key together with what it reads: folds (the shared intermediates, e.g.
+per-month buckets or per-genre lists) and other metrics. Every fold is filled by
+one walk over the master list, once per view (every movie for min_runtime 0,
+otherwise only the movies at least that long), and a walk only fills the folds
+the requested metrics need. A need written "all:<name>" reads the view over
+every movie whatever the cutoff.
+
+StatsCalculator.metric() resolves and memoizes them; STATS_KEYS is the order
+the keys are written in the stats files.
+"""
+
+from utils.calendar_index import WEEKDAYS, calendar_index
+from utils.streaks import find_streaks
+
+
+FOLDS = {}    # fold name -> (fold class, extra constructor args)
+METRICS = {}  # metric name -> (function, needs)
+
+STATS_KEYS = (
+    "monthly_movie_count", "yearly_movie_count", "average_count_monthly", "average_count_weekly",
+    "monthly_rewatch", "yearly_rewatch", "percent_rewatches",
+    "monthly_review", "yearly_review", "percent_review",
+    "monthly_like", "yearly_like", "percent_liked",
+    "yearly_rating_movies", "monthly_rating_movies", "monthly_rating_average", "yearly_rating_average",
+    "yearly_minutes_watched", "yearly_average_legnth", "monthly_minutes_watched", "average_minutes_watched_monthly",
+    "X_movie_watched", "top_movies", "top_actors_10", "top_directors_10", "multiwatches",
+    "num_per_week", "num_per_day", "days_of_the_week",
+    "genres", "genre_averages", "country", "country_averages",
+    "language", "language_averages", "studio", "studio_averages",
+    "releases", "percent_current_years", "rarest_movies", "popular_movies",
+    "most_movies_daily", "most_movies_weekly",
+    "consecutive_days", "longest_daily_streak", "consecutive_weeks", "longest_weekly_streak",
+    "consecutive_months", "longest_monthly_streak",
+    "weeks list",
+)
+
+FLAGS = ("rewatched", "reviewed", "liked")
+
+
+def fold(name: str, *args):
+    """Register a fold class as `name`; it is built as `cls(calc, *args)`."""
+    def register(cls):
+        FOLDS[name] = (cls, args)
+        return cls
+    return register
+
+
+def metric(name: str, *needs: str):
+    """Register `function(calc, min_runtime)` as the metric `name`, reading the folds and metrics in `needs`."""
+    def register(function):
+        METRICS[name] = (function, needs)
+        return function
+    return register
+
+
+def append_to(groups: dict, key, movie_num: str):
+    if key not in groups:
+        groups[key] = []
+    groups[key].append(movie_num)
+
+
+def average_from_movies(movies_dict):
+    total_votes = sum(len(lst) for lst in movies_dict.values())
+    if total_votes == 0:
+        return 0.0
+    total_score = sum(r * len(lst) for r, lst in movies_dict.items())
+    return round(total_score / total_votes, 1)
+
+
+def most_per_period(period_lists: dict, view_counts: dict | None = None):
+    """Periods with the most movies (or, given their counts, the most movies of a cutoff), ties kept."""
+    most = 0
+    best = {}
+    for period, period_list in period_lists.items():
+        num = len(period_list) if view_counts is None else view_counts[period]
+        if num > most:
+            most = num
+            best = {}
+            best[period] = period_list
+        elif num == most:
+            best[period] = period_list
+    return best
+
+
+def by_listings(groups: dict) -> dict:
+    return dict(sorted(groups.items(), key=lambda item: len(item[1]), reverse=True))
+
+
+def top_people(people: dict) -> dict:
+    return {
+        data["name"]: data["appearances"]
+        for _, data in sorted(people.items(), key=lambda x: x[1]["appearances"], reverse=True)[:10]
+    }
+
+
+def last_in_view(calc, min_runtime: int) -> bool:
+    return bool(calc.master_list) and calc.is_full(next(reversed(calc.master_list.values())), min_runtime)
+
+
+
+#---------------------------------------Folds---------------------------------------
+
+
+
+class Fold:
+    """Shared intermediate filled one watch at a time by `add`.
+
+    `state` and `restore` round-trip it through a JSON cache file, so a later
+    run can keep adding the watches appended since.
+    """
+
+    def state(self) -> dict:
+        return dict(vars(self))
+
+    def restore(self, state: dict):
+        vars(self).update(state)
+
+
+@fold("months")
+class MonthFold(Fold):
+    """Watches, rewatches, reviews, likes and minutes, for the year and per month."""
+
+    def __init__(self, calc):
+        self.yearly = []
+        self.monthly = calc.add_month_lists()
+        self.flagged = {flag: ([], calc.add_month_lists()) for flag in FLAGS}
+        self.minutes = calc.add_months(default_value=0)
+
+    def add(self, movie_num, key, movie_data, month):
+        self.yearly.append(movie_num)
+        self.monthly[month].append(movie_num)
+        for flag in FLAGS:
+            if movie_data[flag] == True:
+                total, monthly = self.flagged[flag]
+                total.append(movie_num)
+                monthly[month].append(movie_num)
+        runtime = movie_data['runtime']
+        if runtime != 'null':
+            self.minutes[month] += int(runtime)
+
+
+@fold("ratings")
+class RatingFold(Fold):
+    """Movies per month and rating (0.5-5), and the highest rated movies."""
+
+    def __init__(self, calc):
+        self.monthly = {month: {float(i/2): [] for i in range(1, 11)} for month in calc.all_months}
+        self.highest = 0
+        self.top = {}
+
+    def add(self, movie_num, key, movie_data, month):
+        rating = movie_data.get('rating')
+        if rating in ("null", None):
+            return
+        self.monthly[month][float(rating)].append(movie_num)
+        if rating > self.highest:
+            self.highest = rating
+            self.top = {}
+        if rating == self.highest:
+            self.top[movie_num] = movie_data['name']
+
+    def state(self) -> dict:
+        # JSON keys are strings, so each month's ratings are stored as a list (0.5 first)
+        return {"monthly": {month: list(ratings.values()) for month, ratings in self.monthly.items()}, "highest": self.highest, "top": self.top}
+
+    def restore(self, state: dict):
+        self.monthly = {month: {float(i/2): movies for i, movies in enumerate(ratings, 1)} for month, ratings in state["monthly"].items()}
+        self.highest = state["highest"]
+        self.top = state["top"]
+
+
+@fold("watches")
+class WatchFold(Fold):
+    """Every watch of each film, by slug."""
+
+    def __init__(self, calc):
+        self.slugs = {}
+
+    def add(self, movie_num, key, movie_data, month):
+        append_to(self.slugs, movie_data['slug'], key)
+
+
+@fold("calendar")
+class CalendarFold(Fold):
+    """Movies per day, week and weekday, bucketed through the year's calendar index."""
+
+    def __init__(self, calc):
+        self.index = calendar_index(calc.year)
+        self.daily = {day: [] for day in self.index.day_labels}
+        self.weekly = {week: [] for week in self.index.week_labels}
+        self.weekdays = {name: [] for name in WEEKDAYS}
+
+    def add(self, movie_num, key, movie_data, month):
+        d = movie_data['date']
+        bucket = self.index.lookup(d['year'], d['month'], d['day'])
+        if bucket is not None:
+            day, week, weekday = bucket
+            self.daily[day].append(key)
+            self.weekly[week].append(key)
+            self.weekdays[weekday].append(key)
+
+    def state(self) -> dict:
+        return {"daily": self.daily, "weekly": self.weekly, "weekdays": self.weekdays}
+
+
+@fold("genre_lists", "genres")
+@fold("country_lists", "country")
+@fold("studio_lists", "studio")
+class GroupFold(Fold):
+    """Movies and rating [total, num] per value of a list field (a movie listing a value twice counts twice)."""
+
+    def __init__(self, calc, field: str):
+        self.field = field
+        self.groups = {}
+        self.totals = {}
+
+    def add(self, movie_num, key, movie_data, month):
+        if self.field not in movie_data or movie_data[self.field] == []:
+            return
+        rating = movie_data.get('rating')
+        rated = rating != 'null' and rating != None
+        groups, totals = self.groups, self.totals
+        for value in movie_data[self.field]:
+            if value in groups:
+                groups[value].append(key)
+            else:
+                groups[value] = [key]
+                totals[value] = [0, 0]
+            if rated:
+                totals[value][0] += float(rating)
+                totals[value][1] += 1
+
+
+@fold("language_lists")
+class LanguageFold(Fold):
+    """Languages ranked by every listing, but each movie only counted once per language."""
+
+    def __init__(self, calc):
+        self.counts = {}
+        self.groups = {}
+        self.totals = {}
+
+    def add(self, movie_num, key, movie_data, month):
+        if 'language' not in movie_data or movie_data['language'] == []:
+            return
+        rating = movie_data.get('rating')
+        rated = rating != 'null' and rating != None
+        counts, groups, totals = self.counts, self.groups, self.totals
+        movie_languages = set()
+        for language in movie_data['language']:
+            counts[language] = counts.get(language, 0) + 1
+            if language in movie_languages:
+                continue
+            movie_languages.add(language)
+            if language in groups:
+                groups[language].append(key)
+            else:
+                groups[language] = [key]
+                totals[language] = [0, 0]
+            if rated:
+                totals[language][0] += float(rating)
+                totals[language][1] += 1
+
+
+@fold("release_years")
+class ReleaseFold(Fold):
+    """Movies per release year, and how many came out in the stats year."""
+
+    def __init__(self, calc):
+        self.year = calc.year
+        self.releases = {}
+        self.current = 0
+
+    def add(self, movie_num, key, movie_data, month):
+        if 'released' in movie_data and movie_data['released'] != []:
+            append_to(self.releases, movie_data['released'], key)
+            if movie_data['released'] == self.year:
+                self.current += 1
+
+    def state(self) -> dict:
+        # Release years are stored as [year, movies] pairs to keep them ints
+        return {"releases": list(self.releases.items()), "current": self.current}
+
+    def restore(self, state: dict):
+        self.releases = {released: movies for released, movies in state["releases"]}
+        self.current = state["current"]
+
+
+@fold("popularity")
+class PopularityFold(Fold):
+    """Letterboxd members of each movie (watcher stats may still be pending for a deferred build)."""
+
+    def __init__(self, calc):
+        self.members = {}
+
+    def add(self, movie_num, key, movie_data, month):
+        if "members" in (movie_data.get("popularity") or {}):
+            self.members[movie_num] = movie_data["popularity"]["members"]
+
+
+
+#---------------------------------------Counts---------------------------------------
+
+
+
+@metric("monthly_movie_count", "months")
+def monthly_movie_count(calc, min_runtime):
+    return calc.fold("months", min_runtime).monthly
+
+
+@metric("yearly_movie_count", "months")
+def yearly_movie_count(calc, min_runtime):
+    return calc.fold("months", min_runtime).yearly
+
+
+@metric("average_count_monthly", "months")
+def average_count_monthly(calc, min_runtime):
+    return round((len(calc.fold("months", min_runtime).yearly) / 12), 1)
+
+
+@metric("average_count_weekly", "months")
+def average_count_weekly(calc, min_runtime):
+    return round((len(calc.fold("months", min_runtime).yearly) / 52), 1)
+
+
+def register_flag(flag: str, name: str, percent: str):
+    @metric(f"monthly_{name}", "months")
+    def monthly(calc, min_runtime):
+        return calc.fold("months", min_runtime).flagged[flag][1]
+
+    @metric(f"yearly_{name}", "months")
+    def yearly(calc, min_runtime):
+        return calc.fold("months", min_runtime).flagged[flag][0]
+
+    @metric(percent, "months")
+    def percent(calc, min_runtime):
+        months = calc.fold("months", min_runtime)
+        return round((len(months.flagged[flag][0]) / len(months.yearly)), 2) if months.yearly else 0.0
+
+
+register_flag("rewatched", "rewatch", "percent_rewatches")
+register_flag("reviewed", "review", "percent_review")
+register_flag("liked", "like", "percent_liked")
+
+
+
+#---------------------------------------Ratings---------------------------------------
+
+
+
+@metric("monthly_rating_movies", "ratings")
+def monthly_rating_movies(calc, min_runtime):
+    return calc.fold("ratings", min_runtime).monthly
+
+
+@metric("yearly_rating_movies", "monthly_rating_movies")
+def yearly_rating_movies(calc, min_runtime):
+    """Aggregate to yearly (1-10) - lists of movie nums"""
+    monthly = calc.metric("monthly_rating_movies", min_runtime)
+    yearly = {float(i/2): [] for i in range(1, 11)}
+    for month in calc.all_months:
+        for rating in yearly:
+            yearly[rating].extend(monthly[month][rating])
+    return yearly
+
+
+@metric("monthly_rating_average", "monthly_rating_movies")
+def monthly_rating_average(calc, min_runtime):
+    return {m: average_from_movies(c) for m, c in calc.metric("monthly_rating_movies", min_runtime).items()}
+
+
+@metric("yearly_rating_average", "yearly_rating_movies")
+def yearly_rating_average(calc, min_runtime):
+    return average_from_movies(calc.metric("yearly_rating_movies", min_runtime))
+
+
+@metric("top_movies", "ratings")
+def top_movies(calc, min_runtime):
+    return calc.fold("ratings", min_runtime).top
+
+
+
+#---------------------------------------Watch-Time---------------------------------------
+
+
+
+@metric("monthly_minutes_watched", "months")
+def monthly_minutes_watched(calc, min_runtime):
+    return calc.fold("months", min_runtime).minutes
+
+
+@metric("yearly_minutes_watched", "months")
+def yearly_minutes_watched(calc, min_runtime):
+    return sum(calc.fold("months", min_runtime).minutes.values())
+
+
+@metric("yearly_average_legnth", "months", "yearly_minutes_watched")
+def yearly_average_legnth(calc, min_runtime):
+    count = len(calc.fold("months", min_runtime).yearly)
+    return round(((calc.metric("yearly_minutes_watched", min_runtime) / count) if count != 0 else 0), 1)
+
+
+@metric("average_minutes_watched_monthly", "months")
+def average_minutes_watched_monthly(calc, min_runtime):
+    months = calc.fold("months", min_runtime)
+    average = calc.add_months(default_value=0)
+    for month in months.minutes:
+        count = len(months.monthly[month])
+        average[month] = round(((months.minutes[month] / count) if count != 0 else 0), 1)
+    return average
+
+
+
+#---------------------------------------Number-Movies---------------------------------------
+
+
+
+@metric("X_movie_watched", "months")
+def x_movie_watched(calc, min_runtime):
+    """The 1st, every 25th and the last movie (under a cutoff, the same milestones among its movies)."""
+    nums = calc.fold("months", min_runtime).yearly
+    if not nums:
+        return {}
+    watched = set(nums)
+    milestones = {'1': calc.master_list['1']['name'] if '1' in watched else None}
+    for movie_num in nums:
+        if int(movie_num) % 25 == 0:
+            milestones[movie_num] = calc.master_list[movie_num]['name']
+    last_key = str(len(nums))
+    if last_key in watched:
+        milestones['last'] = calc.master_list[last_key]['name']
+    return milestones
+
+
+
+#---------------------------------------Top-Actor/Director---------------------------------------
+
+
+
+@metric("top_actors_10")
+def top_actors_10(calc, min_runtime):
+    return top_people(calc.people(min_runtime)[0])
+
+
+@metric("top_directors_10")
+def top_directors_10(calc, min_runtime):
+    return top_people(calc.people(min_runtime)[1])
+
+
+
+#---------------------------------------List-Multi-Watches---------------------------------------
+
+
+
+@metric("multiwatches", "all:watches")
+def multiwatches(calc, min_runtime):
+    return {slug: nums for slug, nums in calc.fold("watches").slugs.items() if len(nums) > 1}
+
+
+
+#---------------------------------------Days/Weeks---------------------------------------
+
+
+
+@metric("num_per_week", "calendar")
+def num_per_week(calc, min_runtime):
+    return calc.fold("calendar", min_runtime).weekly
+
+
+@metric("num_per_day", "all:calendar")
+def num_per_day(calc, min_runtime):
+    daily = calc.fold("calendar").daily
+    if not min_runtime:
+        return daily
+    # The filtered day lists have always followed the last movie's runtime
+    keep = last_in_view(calc, min_runtime)
+    return {day: (list(day_list) if keep else []) for day, day_list in daily.items()}
+
+
+@metric("days_of_the_week", "all:calendar")
+def days_of_the_week(calc, min_runtime):
+    weekdays = calc.fold("calendar").weekdays
+    if not min_runtime:
+        return weekdays
+    keep = last_in_view(calc, min_runtime)
+    return {name: (list(day_list) if keep else []) for name, day_list in weekdays.items()}
+
+
+@metric("most_movies_daily", "all:calendar", "calendar")
+def most_movies_daily(calc, min_runtime):
+    daily = calc.fold("calendar").daily
+    if not min_runtime:
+        return most_per_period(daily)
+    return most_per_period(daily, {day: len(day_list) for day, day_list in calc.fold("calendar", min_runtime).daily.items()})
+
+
+@metric("most_movies_weekly", "all:calendar", "calendar")
+def most_movies_weekly(calc, min_runtime):
+    weekly = calc.fold("calendar").weekly
+    if not min_runtime:
+        return most_per_period(weekly)
+    return most_per_period(weekly, {week: len(week_list) for week, week_list in calc.fold("calendar", min_runtime).weekly.items()})
+
+
+@metric("weeks list")
+def weeks_list(calc, min_runtime):
+    return calc.build_weeks()
+
+
+
+#---------------------------------------Genre/Country/Language/Studio---------------------------------------
+
+
+
+def register_group(name: str, lists: str, averages: str, view_min: int):
+    if name != "language":
+        @metric(name, lists)
+        def groups(calc, min_runtime):
+            return by_listings(calc.fold(lists, min_runtime).groups)
+
+    # Averages of the 4+ rated movies (view_min+ under a cutoff), in the order of the unfiltered ranking
+    @metric(averages, lists, f"all:{name}")
+    def group_averages(calc, min_runtime):
+        totals = calc.fold(lists, min_runtime).totals
+        minimum = view_min if min_runtime else 4
+        result = {}
+        for value in calc.metric(name):
+            if value in totals and totals[value][1] >= minimum:
+                total, num = totals[value]
+                result[value] = round(total / num, 2)
+        return result
+
+
+@metric("language", "language_lists")
+def language(calc, min_runtime):
+    languages = calc.fold("language_lists", min_runtime)
+    return {language: languages.groups[language] for language, _ in sorted(languages.counts.items(), key=lambda item: item[1], reverse=True)}
+
+
+register_group("genres", "genre_lists", "genre_averages", 4)
+register_group("country", "country_lists", "country_averages", 5)
+register_group("language", "language_lists", "language_averages", 5)
+register_group("studio", "studio_lists", "studio_averages", 4)
+
+
+
+#---------------------------------------Release-Year---------------------------------------
+
+
+
+@metric("releases", "release_years")
+def releases(calc, min_runtime):
+    return calc.fold("release_years", min_runtime).releases
+
+
+@metric("percent_current_years", "release_years", "months")
+def percent_current_years(calc, min_runtime):
+    yearly = calc.fold("months", min_runtime).yearly
+    return round((calc.fold("release_years", min_runtime).current / len(yearly)), 2) if yearly else 0.0
+
+
+
+#---------------------------------------Rarest/popular---------------------------------------
+
+
+
+@metric("rarest_movies", "popularity")
+def rarest_movies(calc, min_runtime):
+    return dict(sorted(calc.fold("popularity", min_runtime).members.items(), key=lambda item: int(item[1]), reverse=False))
+
+
+@metric("popular_movies", "rarest_movies")
+def popular_movies(calc, min_runtime):
+    return dict(sorted(calc.metric("rarest_movies", min_runtime).items(), key=lambda item: int(item[1]), reverse=True))
+
+
+
+#---------------------------------------Movie-Streak---------------------------------------
+
+
+
+# Streaks always run over every movie, so every cutoff shares them
+@metric("day_streaks", "all:calendar")
+def day_streaks(calc, min_runtime):
+    daily = calc.fold("calendar").daily
+    return find_streaks(daily, daily.values())
+
+
+@metric("week_streaks", "all:calendar")
+def week_streaks(calc, min_runtime):
+    weekly = calc.fold("calendar").weekly
+    return find_streaks(weekly, weekly.values())
+
+
+@metric("month_streaks", "all:months")
+def month_streaks(calc, min_runtime):
+    monthly = calc.fold("months").monthly
+    return find_streaks(monthly, monthly.values())
+
+
+def register_streak(streaks: str, consecutive: str, longest: str):
+    @metric(consecutive, f"all:{streaks}")
+    def consecutive_periods(calc, min_runtime):
+        return calc.metric(streaks)["streaks"]
+
+    @metric(longest, f"all:{streaks}")
+    def longest_streak(calc, min_runtime):
+        return calc.metric(streaks)["longest"]
+
+
+register_streak("day_streaks", "consecutive_days", "longest_daily_streak")
+register_streak("week_streaks", "consecutive_weeks", "longest_weekly_streak")
+register_streak("month_streaks", "consecutive_months", "longest_monthly_streak")
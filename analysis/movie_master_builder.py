@@ -1,77 +1,235 @@
 from letterboxdpy.movie import Movie
-from utils.data_access import DataAccess
+from letterboxdpy.pages.movie_members import MovieMembers
+from utils.data_access import get_data_access
+from utils.film_store import FilmStore
+from utils.profile_store import is_offline
+from utils.fetch_engine import FetchEngine, get_engine
+from utils.credits import build_credits, credits_from_people_lists, people_lists
+from utils import columnar
+from utils.stages import StageLog, content_hash
 import concurrent.futures
 
 
 class MovieMasterListBuilder:
     """Builds a detailed list of movies and related metadata (parallel fetching)."""
 
-    def __init__(self, username: str, year: int, diary_data: dict, trace: bool = True):
+    # Attempts per film before it is skipped, and the base delay between them (doubles each retry)
+    max_attempts = 3
+    retry_delay = 1.0
+
+    # Films at least this long (minutes) count towards the "full" cast and director lists
+    full_runtime = 75
+
+    def __init__(self, username: str, year: int, diary_data: dict, trace: bool = True, engine: FetchEngine | None = None, film_store: FilmStore | None = None):
         self.username = username
         self.year = year
         self.diary_data = diary_data or {}
         self.trace = trace
-        self.data_access = DataAccess()
+        self.data_access = get_data_access()
+        self.stages = StageLog(self.data_access, username, year)
+        self.film_store = film_store or FilmStore()
+        self.engine = engine or get_engine()
 
         self.master_list = {}
         self.cast_list = {}
         self.director_list = {}
         self.full_cast_list = {}
         self.full_director_list = {}
+        self.credits = {}
+        self.failed_slugs = {}
+        self.watcher_futures = {}
 
     # ---------------------------------------------------------
-    # Fetch movie + member stats safely in a worker thread
+    # Fetch movie (core tier) in a fetch engine worker,
+    # optionally with member stats in the same job
     # ---------------------------------------------------------
-    def _fetch_movie_details(self, entry):
+    def _fetch_movie_details(self, entry, with_watchers=True):
         slug = entry.get("slug")
         name = entry.get("name")
 
-        try:
-            movie_details = Movie(slug)
-            members = movie_details.pages.members.get_watchers_stats()
+        movie_details = Movie(slug)
+
+        film = {
+            "slug": slug,
+            "name": name,
+            "year": movie_details.year,
+            "runtime": getattr(movie_details, "runtime", None),
+            "rating": movie_details.rating,
+            "genres": getattr(movie_details, "genres", []),
+            "details": movie_details.details,
+            "cast": getattr(movie_details, "cast", []),
+            "crew": getattr(movie_details, "crew", {}),
+            "popularity": None,
+        }
+
+        # Failed watcher stats don't cost the film its core data: the watcher tier fills them in
+        if with_watchers:
+            try:
+                film["popularity"] = movie_details.pages.members.get_watchers_stats()
+            except Exception as e:
+                if self.trace:
+                    print(f"Error fetching watcher stats for {slug}, leaving them to the watcher tier: {e}")
+
+        # Every fetched film goes straight into the film store, which doubles as the
+        # build checkpoint: a rerun after a crash only fetches what is still missing
+        self.film_store.put(slug, film)
 
-            return slug, {
-                "movie": movie_details,
-                "members": members
-            }
+        return slug, film
 
-        except Exception as e:
+    # ---------------------------------------------------------
+    # Fetch member stats (deferred tier) for a film already in the store
+    # ---------------------------------------------------------
+    def _fetch_watcher_stats(self, slug):
+        members = MovieMembers(slug).get_watchers_stats()
+
+        film = dict(self.film_store.get(slug) or {"slug": slug})
+        film["popularity"] = members
+        self.film_store.put(slug, film)
+
+        return slug, members
+
+    def _submit(self, fn, *args, label: str, stage: str, cost: float = 1):
+        """Queue a fetch on the engine, which retries it with backoff; every attempt is paced like a new request."""
+        def report(attempt, error):
             if self.trace:
-                print(f"Error fetching '{name}' ({slug}): {e}")
+                print(f"Error fetching {label}, attempt {attempt}/{self.max_attempts}: {error}")
 
-            return slug, {
-                "movie": None,
-                "members": None
-            }
+        return self.engine.submit(fn, *args, stage=stage, cost=cost, attempts=self.max_attempts, retry_delay=self.retry_delay, on_error=report)
+
+    def _submit_watcher_stats(self, slugs) -> dict:
+        return {self._submit(self._fetch_watcher_stats, slug, label=f"watcher stats for {slug}", stage="watchers"): slug for slug in slugs}
+
+    @staticmethod
+    def _collect_watcher_stats(futures) -> dict:
+        """{slug: watcher stats} of the finished watcher jobs; films whose jobs failed keep None."""
+        popularity = {}
+        for future in concurrent.futures.as_completed(futures):
+            if future.exception() is None:
+                slug, members = future.result()
+                popularity[slug] = members
+        return popularity
+
+    def fetch_watcher_stats(self):
+        """Queue the deferred tier for every film in the master list still missing watcher stats.
+
+        Jobs run at the lowest priority of the fetch engine, so they only use
+        capacity left over by diary and film fetches.
+        """
+        slugs = {record["slug"] for record in self.master_list.values() if record.get("popularity") is None}
+        self.watcher_futures = self._submit_watcher_stats(slugs)
+
+        if self.trace and slugs:
+            print(f"Queued watcher stats for {len(slugs)} films")
+
+        return self.watcher_futures
+
+    def wait_for_watcher_stats(self):
+        """Fill the queued watcher stats into the master list and save it."""
+        popularity = self._collect_watcher_stats(self.watcher_futures)
+        self.watcher_futures = {}
+
+        for record in self.master_list.values():
+            if record["slug"] in popularity:
+                record["popularity"] = popularity[record["slug"]]
+
+        cache_master = f"{self.username}_{self.year}_master.json"
+        self.data_access.save_json(self.username, self.year, cache_master, self.master_list)
+        self._export_dataset()
+
+        if self.trace:
+            print(f"Filled watcher stats for {len(popularity)} films")
+
+        return self.master_list
+
+    def _export_dataset(self):
+        """Mirror the master list and credits into the columnar Parquet dataset."""
+        paths = columnar.export_year(self.username, self.year, self.master_list, self.credits)
+        if self.trace and paths is None:
+            print("pyarrow is not installed, skipping the Parquet dataset export")
+
+    def _derive_people_lists(self):
+        """Fill the cast and director lists from the master list and credits."""
+        self.cast_list, self.director_list = people_lists(self.master_list, self.credits)
+        self.full_cast_list, self.full_director_list = people_lists(self.master_list, self.credits, min_runtime=self.full_runtime)
+
+    def _credits_from_old_lists(self):
+        """Credits of a year cached before credits, rebuilt from its old cast and director files (and saved)."""
+        cast_list = self.data_access.load_json(self.username, self.year, f"{self.username}_{self.year}_cast.json")
+        director_list = self.data_access.load_json(self.username, self.year, f"{self.username}_{self.year}_director.json")
+        if cast_list is None and director_list is None:
+            return None
+
+        credits = credits_from_people_lists(cast_list, director_list)
+        self.data_access.save_json(self.username, self.year, f"{self.username}_{self.year}_credits.json", credits)
+        if self.trace:
+            print(f"Rebuilt credits for {self.username} {self.year} from the old cast and director lists")
+        return credits
+
+    def _keep_cached_offline(self, watches: int) -> bool:
+        """Serve the cached lists instead of an offline build with only `watches` watches.
+
+        Returns False when there is no cached master list to fall back on, and stops
+        the run when the offline build would be empty as well.
+        """
+        cached_master = self.data_access.load_json(self.username, self.year, f"{self.username}_{self.year}_master.json")
+        if not cached_master or len(cached_master) < watches:
+            if watches == 0:
+                raise RuntimeError(f"None of the films of {self.username} {self.year} are cached; run once without --offline first")
+            return False
+
+        credits = self.data_access.load_json(self.username, self.year, f"{self.username}_{self.year}_credits.json")
+        if credits is None:
+            credits = self._credits_from_old_lists()
+        if credits is None:
+            films = [self.film_store.get(record["slug"]) for record in cached_master.values()]
+            credits = build_credits([film for film in films if film is not None])
+
+        self.master_list = cached_master
+        self.credits = credits
+        self._derive_people_lists()
+
+        print(f"Offline: {len(self.failed_slugs)} films of {self.username} {self.year} are not in the film store, keeping the cached lists ({len(cached_master)} watches)")
+        return True
 
     # ---------------------------------------------------------
     # Build full master + cast + director lists
     # ---------------------------------------------------------
-    def build(self, force_refresh=False):
+    def build(self, force_refresh=False, defer_watchers=False):
+        """Build (or load) the master, cast and director lists.
+
+        With `defer_watchers`, only the core tier (details, cast, crew, genres) is
+        fetched before the lists are built; watcher stats are queued in the
+        background afterwards and can be collected with `wait_for_watcher_stats`.
+        """
 
         cache_master = f"{self.username}_{self.year}_master.json"
-        cache_cast = f"{self.username}_{self.year}_cast.json"
-        cache_director = f"{self.username}_{self.year}_director.json"
-        cache_full_cast = f"{self.username}_{self.year}_full_cast.json"
-        cache_full_director = f"{self.username}_{self.year}_full_director.json"
+        cache_credits = f"{self.username}_{self.year}_credits.json"
+        cache_failed = f"{self.username}_{self.year}_failed.json"
 
         # -----------------------------------------------------
         # Try loading from cache first
         # -----------------------------------------------------
-        if not force_refresh:
+        # A previous build that skipped films is resumed instead of served from cache
+        previous_failed = self.data_access.load_json(self.username, self.year, cache_failed) or {}
+        if previous_failed and self.trace:
+            print(f"Resuming build for {self.username} {self.year}: {len(previous_failed)} films failed last run")
+
+        # A refresh whose diary hashes the same as the last build's can reuse that build too
+        diary_hash = content_hash(self.diary_data)
+        if (not force_refresh or self.stages.unchanged("build", diary_hash)) and not previous_failed:
 
             cached_master = self.data_access.load_json(self.username, self.year, cache_master)
-            cached_cast = self.data_access.load_json(self.username, self.year, cache_cast)
-            cached_director = self.data_access.load_json(self.username, self.year, cache_director)
-            cached_full_cast = self.data_access.load_json(self.username, self.year, cache_full_cast)
-            cached_full_director = self.data_access.load_json(self.username, self.year, cache_full_director)
+            cached_credits = self.data_access.load_json(self.username, self.year, cache_credits)
+            if cached_master and cached_credits is None:
+                cached_credits = self._credits_from_old_lists()
+
+            # Unless deferring them, a build still missing watcher stats is redone to fill them in
+            complete = defer_watchers or not force_refresh or all(r.get("popularity") is not None for r in (cached_master or {}).values())
 
-            if cached_master and cached_cast and cached_director and cached_full_cast and cached_full_director:
+            if cached_master and cached_credits and complete:
                 self.master_list = cached_master
-                self.cast_list = cached_cast
-                self.director_list = cached_director
-                self.full_cast_list = cached_full_cast
-                self.full_director_list = cached_full_director
+                self.credits = cached_credits
+                self._derive_people_lists()
 
                 if self.trace:
                     print(f"Loaded all cached list for {self.username} {self.year}")
@@ -106,21 +264,58 @@ class MovieMasterListBuilder:
         # -----------------------------------------------------
         # Fetch movie details in parallel
         # -----------------------------------------------------
-        # Fetch all movie details in parallel
+        # Films already in the shared store (from any user or year) are reused,
+        # and rewatches only trigger a single fetch per slug
         results = {}
-        with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
-            futures = [executor.submit(self._fetch_movie_details, e) for e in all_entries]
+        to_fetch = {}
+        for entry in all_entries:
+            slug = entry.get("slug")
+            if slug in results or slug in to_fetch:
+                continue
 
-            for i, future in enumerate(concurrent.futures.as_completed(futures), 1):
-                slug, details = future.result()
-                results[slug] = details
+            film = self.film_store.get(slug)
+            if film is not None:
+                results[slug] = film
+            else:
+                to_fetch[slug] = entry
+
+        # Offline, films missing from the store are skipped and retried by the next online build
+        if is_offline():
+            for slug in to_fetch:
+                self.failed_slugs[slug] = "not in the film store (offline)"
+            to_fetch = {}
+
+        if self.trace:
+            print(f"Found {len(results)} films in the shared store, fetching {len(to_fetch)}")
+
+        # A full job loads the film page and its members page, so it costs two requests
+        with_watchers = not defer_watchers and not is_offline()
+        futures = {
+            self._submit(self._fetch_movie_details, e, with_watchers, label=f"'{e.get('name')}' ({slug})", stage="movie", cost=2 if with_watchers else 1): slug
+            for slug, e in to_fetch.items()
+        }
+
+        for i, future in enumerate(concurrent.futures.as_completed(futures), 1):
+            slug = futures[future]
+            if future.exception() is not None:
+                # Skipped films are remembered so the next run retries them
+                self.failed_slugs[slug] = str(future.exception())
+                results[slug] = None
+            else:
+                results[slug] = future.result()[1]
 
-                #THIS is the correct place for the trace print
-                if self.trace and i % 10 == 0:
-                    print(f"Fetched details for {i} movies...")
+            #THIS is the correct place for the trace print
+            if self.trace and i % 10 == 0:
+                print(f"Fetched details for {i} movies...")
+
+        # Films stored by an earlier deferred build only need their watcher stats
+        if with_watchers:
+            missing = [slug for slug, film in results.items() if film and film.get("popularity") is None]
+            for slug, members in self._collect_watcher_stats(self._submit_watcher_stats(missing)).items():
+                results[slug] = dict(results[slug], popularity=members)
 
         # -----------------------------------------------------
-        # Build master, cast, and director dictionaries
+        # Build master dictionary
         # -----------------------------------------------------
         movie_num = 1
 
@@ -128,15 +323,15 @@ class MovieMasterListBuilder:
             slug = entry.get("slug")
             name = entry.get("name")
 
-            details_block = results.get(slug, {})
-            movie_details = details_block.get("movie")
-            details = movie_details.details
-            members = details_block.get("members")
+            movie_details = results.get(slug)
 
             # Skip movies that failed to fetch
             if not movie_details:
                 continue
 
+            details = movie_details["details"]
+            members = movie_details.get("popularity")
+
             # Extract fields safely
             studios = [s['name'] for s in details if s['type'] == 'studio']
             countries = [c['name'] for c in details if c['type'] == 'country']
@@ -153,11 +348,11 @@ class MovieMasterListBuilder:
                 "reviewed": bool(entry.get("actions", {}).get("reviewed")),
                 "liked": bool(entry.get("actions", {}).get("liked")),
                 "date": entry.get("date"),
-                "released": movie_details.year,
-                "runtime": getattr(movie_details, "runtime", None),
+                "released": movie_details["year"],
+                "runtime": movie_details["runtime"],
                 "popularity": members,
-                "average rating": movie_details.rating,
-                "genres": [g.get("name") for g in getattr(movie_details, "genres", []) if g.get("type") == "genre"],
+                "average rating": movie_details["rating"],
+                "genres": [g.get("name") for g in movie_details["genres"] if g.get("type") == "genre"],
                 #"themes": themes,
                 "country": countries,
                 "language": languages,
@@ -169,96 +364,36 @@ class MovieMasterListBuilder:
             if self.trace and movie_num % 10 == 0:
                 print(f"Fetched details for {movie_num} movies...")
 
-            # -------------------------------------------------
-            # CAST LIST
-            # -------------------------------------------------
-            for member in getattr(movie_details, "cast", []):
-                cast_slug = member.get("slug")
-                cast_name = member.get("name")
-                role = member.get("role_name")
-
-                if not cast_slug or not cast_name:
-                    continue
-
-                if cast_slug not in self.cast_list:
-                    self.cast_list[cast_slug] = {
-                        "name": cast_name,
-                        "slug": cast_slug,
-                        "appearances": 0,
-                        "roles": [],
-                    }
-
-                self.cast_list[cast_slug]["appearances"] += 1
-                self.cast_list[cast_slug]["roles"].append((slug, role))
-
-                # Add to full_cast_list if runtime >= 75
-                if record.get("runtime") != 'null' and record.get("runtime") and int(record.get("runtime")) >= 75:
-                    if cast_slug not in self.full_cast_list:
-                        self.full_cast_list[cast_slug] = {
-                            "name": cast_name,
-                            "slug": cast_slug,
-                            "appearances": 0,
-                            "roles": [],
-                        }
-                    self.full_cast_list[cast_slug]["appearances"] += 1
-                    self.full_cast_list[cast_slug]["roles"].append((slug, role))
-
-            # -------------------------------------------------
-            # DIRECTOR LIST
-            # -------------------------------------------------
-            crew = getattr(movie_details, "crew", {})
-            directors = crew.get("director", [])
-            if isinstance(directors, dict):
-                directors = [directors]
-
-            for director in directors:
-                dir_slug = director.get("slug")
-                dir_name = director.get("name")
-
-                if not dir_slug or not dir_name:
-                    continue
-
-                if dir_slug not in self.director_list:
-                    self.director_list[dir_slug] = {
-                        "name": dir_name,
-                        "slug": dir_slug,
-                        "appearances": 0,
-                        "movies": [],
-                    }
-
-                self.director_list[dir_slug]["appearances"] += 1
-                self.director_list[dir_slug]["movies"].append(slug)
-
-                # Add to full_director_list if runtime >= 75
-                if record.get("runtime") != 'null' and record.get("runtime") and int(record.get("runtime")) >= 75:
-                    if dir_slug not in self.full_director_list:
-                        self.full_director_list[dir_slug] = {
-                            "name": dir_name,
-                            "slug": dir_slug,
-                            "appearances": 0,
-                            "movies": [],
-                        }
-                    self.full_director_list[dir_slug]["appearances"] += 1
-                    self.full_director_list[dir_slug]["movies"].append(slug)
+        # Offline, a build missing films never replaces a cached master list with more watches
+        if is_offline() and self.failed_slugs and self._keep_cached_offline(len(self.master_list)):
+            return self.master_list, self.cast_list, self.director_list, self.full_cast_list, self.full_director_list
 
         # -----------------------------------------------------
-        # Sort cast & director lists
+        # Credits, and the cast & director lists derived from them
         # -----------------------------------------------------
-        self.cast_list = dict(sorted(self.cast_list.items(), key=lambda x: x[1]["appearances"], reverse=True))
-        self.director_list = dict(sorted(self.director_list.items(), key=lambda x: x[1]["appearances"], reverse=True))
-        self.full_cast_list = dict(sorted(self.full_cast_list.items(), key=lambda x: x[1]["appearances"], reverse=True))
-        self.full_director_list = dict(sorted(self.full_director_list.items(), key=lambda x: x[1]["appearances"], reverse=True))
+        self.credits = build_credits([results[record["slug"]] for record in self.master_list.values()])
+        self._derive_people_lists()
 
         # -----------------------------------------------------
         # Save to cache
         # -----------------------------------------------------
         self.data_access.save_json(self.username, self.year, cache_master, self.master_list)
-        self.data_access.save_json(self.username, self.year, cache_cast, self.cast_list)
-        self.data_access.save_json(self.username, self.year, cache_director, self.director_list)
-        self.data_access.save_json(self.username, self.year, cache_full_cast, self.full_cast_list)
-        self.data_access.save_json(self.username, self.year, cache_full_director, self.full_director_list)
+        self.data_access.save_json(self.username, self.year, cache_credits, self.credits)
+        self._export_dataset()
+
+        # Remember skipped films so the next run retries them
+        self.data_access.save_json(self.username, self.year, cache_failed, self.failed_slugs)
+        self.stages.record("build", diary_hash)
 
         if self.trace:
             print(f"Saved all data lists for {self.username} {self.year}")
 
+        if defer_watchers and not is_offline():
+            self.fetch_watcher_stats()
+
+        if self.failed_slugs:
+            print(f"Skipped {len(self.failed_slugs)} films that could not be fetched for {self.username} {self.year}:")
+            for slug, error in self.failed_slugs.items():
+                print(f"  {slug}: {error}")
+
         return self.master_list, self.cast_list, self.director_list, self.full_cast_list, self.full_director_list
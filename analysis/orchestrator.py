@@ -1,30 +1,47 @@
+import concurrent.futures
+from letterboxdpy.user import User
+from utils.film_store import FilmStore
+from utils.manifest import SCHEMA_VERSIONS, batched_records
+from utils.stages import content_hash
 from .data_fetcher import DiaryFetcher
 from .movie_master_builder import MovieMasterListBuilder
-from .stats_calculator import StatsCalculator
+from .rollup import summarize
+from .stats_calculator import get_stats_calculator
 from .report_printer import ReportPrinter
 
 class LetterboxdAnalysis:
     """Orchestrates the entire Letterboxd data analysis pipeline."""
 
-    def __init__(self, user: str, year: int, trace: bool = True):
+    def __init__(self, user: str, year: int, trace: bool = True, user_instance: User = None, film_store: FilmStore = None):
         self.user = user
         self.year = year
         self.trace = trace
+        self.user_instance = user_instance
+        self.film_store = film_store
 
-    def run(self, force_refresh: bool = False, summary_only: bool = False):
-        fetcher = DiaryFetcher(self.user, self.year, trace=self.trace)
-        diary_data = fetcher.fetch(force_refresh=force_refresh)
+    # Every cache write of the run updates the manifest once, at the end
+    @batched_records()
+    def run(self, force_refresh: bool = False, summary_only: bool = False, incremental: bool = False, defer_watchers: bool = False):
+        fetcher = DiaryFetcher(self.user, self.year, trace=self.trace, user_instance=self.user_instance)
+        diary_data = fetcher.fetch(force_refresh=force_refresh, incremental=incremental)
+        # A refresh opened a User session; its profile info fills the stats without another scrape
+        self.user_instance = fetcher.user_instance
 
-        builder = MovieMasterListBuilder(self.user, self.year, diary_data, trace=self.trace)
-        # MovieMasterListBuilder.build() returns (master_list, cast_list, director_list, full_cast_list, full_director_list)
-        master_list, cast_list, director_list, full_cast_list, full_director_list = builder.build(force_refresh=force_refresh)
+        # An incremental sync may have changed the diary, so the lists are rebuilt (films come from the shared store)
+        self.analyze(diary_data, force_refresh=force_refresh or incremental, summary_only=summary_only, defer_watchers=defer_watchers)
 
-        calculator = StatsCalculator(diary_data, master_list, cast_list, director_list, self.year, self.user, full_cast_list, full_director_list)
-        stats = calculator.compute()
-        full_stats = calculator.full_stats
+    def analyze(self, diary_data: dict, force_refresh: bool = False, summary_only: bool = False, defer_watchers: bool = False):
+        """Build the lists, stats and report for an already fetched diary."""
+        builder = MovieMasterListBuilder(self.user, self.year, diary_data, trace=self.trace, film_store=self.film_store)
+        # The lists stay on the builder; the stats stage reads them from there
+        builder.build(force_refresh=force_refresh, defer_watchers=defer_watchers)
 
-        printer = ReportPrinter(stats, self.user, self.year, master_list, full_stats)
-        printer.print_summary()
+        self._compute_stats(builder, diary_data)
+
+        # Stats above were saved without pending watcher stats; redo them once the deferred tier lands
+        if builder.watcher_futures:
+            builder.wait_for_watcher_stats()
+            self._compute_stats(builder, diary_data)
 
         """
         #jank but works I guess
@@ -32,4 +49,75 @@ class LetterboxdAnalysis:
             print("\n--- Master Movie List Preview (first 5 entries) ---")
             for k, v in list(master_list.items())[:5]:
                 print(v.get("name") or v.get("title") or "<unknown>")
-                """
\ No newline at end of file
+                """
+
+
+    def _compute_stats(self, builder: MovieMasterListBuilder, diary_data: dict):
+        """Compute and export the stats, unless their inputs match the last export."""
+        stats_hash = content_hash(diary_data, builder.master_list, builder.credits, builder.full_runtime, SCHEMA_VERSIONS["stats"])
+        if builder.stages.unchanged("stats", stats_hash) and builder.data_access.load_json(self.user, self.year, f"{self.user}_{self.year}_stats.json") is not None:
+            if self.trace:
+                print(f"Stats for {self.user} {self.year} are up to date")
+            return
+
+        calculator = get_stats_calculator(diary_data, builder.master_list, builder.cast_list, builder.director_list, self.year, self.user, builder.full_cast_list, builder.full_director_list, user_info=self.user_instance, credits=builder.credits)
+
+        # Watches appended since the last run are folded into its saved aggregates instead of recomputing the year
+        aggregates_file = f"{self.user}_{self.year}_aggregates.json"
+        previous = builder.data_access.load_json(self.user, self.year, aggregates_file)
+        if previous and calculator.resume(previous) and self.trace:
+            print(f"Extending the stats of {self.user} {self.year} with {len(builder.master_list) - previous['movies']} new watches")
+
+        stats = calculator.compute()
+        aggregates = calculator.aggregates()
+        if aggregates is not None:
+            builder.data_access.save_json(self.user, self.year, aggregates_file, aggregates)
+
+        printer = ReportPrinter(stats, self.user, self.year, builder.master_list)
+        printer.print_summary()
+        # Lifetime and multi-year stats merge these per-year summaries instead of reading every year's lists
+        builder.data_access.save_json(self.user, self.year, f"{self.user}_{self.year}_summary.json", summarize(stats))
+        builder.stages.record("stats", stats_hash)
+
+
+class MultiYearAnalysis:
+    """Runs the pipeline for several years of one user in a single pass.
+
+    Every year's diary is fetched at once through the shared fetch engine, and the
+    years share one User session and one film store, so a film logged in several
+    years is only fetched once.
+    """
+
+    def __init__(self, user: str, years: list, trace: bool = True):
+        self.user = user
+        self.years = sorted(set(years))
+        self.trace = trace
+
+    @batched_records()
+    def run(self, force_refresh: bool = False, summary_only: bool = False, incremental: bool = False, defer_watchers: bool = False):
+        # Only a refresh needs the profile up front; unchanged years never touch it
+        user_instance = User(self.user) if force_refresh or incremental else None
+        film_store = FilmStore()
+
+        # Fetch all diaries together; their month requests interleave in the fetch engine
+        diaries = {}
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(self.years)) as executor:
+            futures = {
+                executor.submit(
+                    DiaryFetcher(self.user, year, trace=self.trace, user_instance=user_instance).fetch,
+                    force_refresh=force_refresh,
+                    incremental=incremental,
+                ): year
+                for year in self.years
+            }
+            for future in concurrent.futures.as_completed(futures):
+                diaries[futures[future]] = future.result()
+
+        for year in self.years:
+            if not any(month.get("entries") for month in diaries[year].values()):
+                if self.trace:
+                    print(f"No diary entries for {self.user} {year}, skipping")
+                continue
+
+            analysis = LetterboxdAnalysis(self.user, year, trace=self.trace, user_instance=user_instance, film_store=film_store)
+            analysis.analyze(diaries[year], force_refresh=force_refresh or incremental, summary_only=summary_only, defer_watchers=defer_watchers)
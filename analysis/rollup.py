@@ -0,0 +1,191 @@
+"""Mergeable per-year summaries, for lifetime and multi-year stats.
+
+A year's summary (`<user>_<year>_summary.json`, a few KB) only holds counts,
+sums and histograms, plus the run lengths of its day streaks:
+
+    {"schema": 1, "first_year": 2024, "last_year": 2024,
+     "days": {"length": 366, "leading": 3, "trailing": 0, "longest": 9},
+     "totals": {"watches": 412, "ratings": [0.5 count, ..., 5.0 count],
+                "genres": {"Drama": [watches, rating total, rated watches]}, ...}}
+
+merge() combines two summaries of consecutive year ranges (or with a gap,
+counted as days without movies) and is associative, so any range of years
+rolls up with one merge per year instead of reading every master list.
+"""
+
+from functools import reduce
+from utils.calendar_index import WEEKDAYS, calendar_index
+from utils.manifest import SCHEMA_VERSIONS
+
+MONTHS = ["January", "February", "March", "April", "May", "June", "July", "August", "September", "October", "November", "December"]
+# Summary group -> the yearly stats key of its averages
+GROUPS = {"genres": "genre_averages", "country": "country_averages", "language": "language_averages", "studio": "studio_averages"}
+
+
+def day_runs(occupied: list) -> dict:
+    """Run lengths of consecutive days with movies: at the start, at the end and the longest."""
+    leading = next((i for i, active in enumerate(occupied) if not active), len(occupied))
+    trailing = next((i for i, active in enumerate(reversed(occupied)) if not active), len(occupied))
+    longest = run = 0
+    for active in occupied:
+        run = run + 1 if active else 0
+        longest = max(longest, run)
+    return {"length": len(occupied), "leading": leading, "trailing": trailing, "longest": longest}
+
+
+def merge_days(first: dict, second: dict) -> dict:
+    """Run lengths of `first` followed by `second`; a run crossing the boundary joins up."""
+    return {
+        "length": first["length"] + second["length"],
+        "leading": first["leading"] if first["leading"] < first["length"] else first["length"] + second["leading"],
+        "trailing": second["trailing"] if second["trailing"] < second["length"] else second["length"] + first["trailing"],
+        "longest": max(first["longest"], second["longest"], first["trailing"] + second["leading"]),
+    }
+
+
+def add(first, second):
+    """Sum two totals: numbers add, lists add element-wise and dicts key by key."""
+    if isinstance(first, dict):
+        merged = dict(first)
+        for key, value in second.items():
+            merged[key] = add(merged[key], value) if key in merged else value
+        return merged
+    if isinstance(first, list):
+        return [add(a, b) for a, b in zip(first, second)]
+    return first + second
+
+
+def summarize(stats: dict) -> dict:
+    """Summary of one year, read from its stats (either backend, any cached stats file)."""
+    s = stats["stats"]
+    year = int(stats["info"]["year"])
+    index = calendar_index(year)
+
+    # JSON turns the rating keys into strings; they stay in 0.5-5 order
+    ratings = {}
+    for rating, movie_nums in s["yearly_rating_movies"].items():
+        for movie_num in movie_nums:
+            ratings[movie_num] = float(rating)
+
+    def groups(lists: dict) -> dict:
+        summary = {}
+        for value, movie_nums in lists.items():
+            rated = [ratings[movie_num] for movie_num in movie_nums if movie_num in ratings]
+            summary[value] = [len(movie_nums), sum(rated), len(rated)]
+        return summary
+
+    # Months are counted from the day lists: older stats files have broken monthly lists
+    per_day = [len(s["num_per_day"].get(label, [])) for label in index.day_labels]
+    month_ends = index.month_offsets[1:] + [index.days]
+    months = {month: sum(per_day[start:end]) for month, start, end in zip(MONTHS, index.month_offsets, month_ends)}
+
+    totals = {
+        "years": {str(year): len(s["yearly_movie_count"])},
+        "watches": len(s["yearly_movie_count"]),
+        "rewatches": len(s["yearly_rewatch"]),
+        "reviews": len(s["yearly_review"]),
+        "likes": len(s["yearly_like"]),
+        "minutes": s["yearly_minutes_watched"],
+        "ratings": [len(movie_nums) for movie_nums in s["yearly_rating_movies"].values()],
+        "months": months,
+        "weekdays": {name: len(s["days_of_the_week"].get(name, [])) for name in WEEKDAYS},
+        # Keyed as in the saved stats file, where an unknown release year is "null"
+        "releases": {"null" if released is None else str(released): len(movie_nums) for released, movie_nums in s["releases"].items()},
+    }
+    for name in GROUPS:
+        totals[name] = groups(s[name])
+
+    return {
+        "schema": SCHEMA_VERSIONS["summary"],
+        "first_year": year,
+        "last_year": year,
+        "days": day_runs([count > 0 for count in per_day]),
+        "totals": totals,
+    }
+
+
+def empty_days(first_year: int, last_year: int) -> dict:
+    """Run lengths of years without any movies."""
+    length = sum(calendar_index(year).days for year in range(first_year, last_year + 1))
+    return {"length": length, "leading": 0, "trailing": 0, "longest": 0}
+
+
+def merge(first: dict, second: dict) -> dict:
+    """Summary of `first`'s years followed by `second`'s (years between them count as empty)."""
+    if second["first_year"] <= first["last_year"]:
+        raise ValueError(f"Can only merge later years: {second['first_year']} after {first['last_year']}")
+
+    days = first["days"]
+    if second["first_year"] > first["last_year"] + 1:
+        days = merge_days(days, empty_days(first["last_year"] + 1, second["first_year"] - 1))
+
+    return {
+        "schema": first["schema"],
+        "first_year": first["first_year"],
+        "last_year": second["last_year"],
+        "days": merge_days(days, second["days"]),
+        "totals": add(first["totals"], second["totals"]),
+    }
+
+
+def rollup(summaries) -> dict | None:
+    """Merge the summaries of any years, in year order."""
+    summaries = sorted(summaries, key=lambda summary: summary["first_year"])
+    return reduce(merge, summaries) if summaries else None
+
+
+def load_summary(data_access, user: str, year) -> dict | None:
+    """The cached summary of a year, made from its stats file (and saved) when missing or outdated."""
+    filename = f"{user}_{year}_summary.json"
+    summary = data_access.load_json(user, year, filename)
+    if summary and summary.get("schema") == SCHEMA_VERSIONS["summary"]:
+        return summary
+
+    stats = data_access.load_json(user, year, f"{user}_{year}_stats.json")
+    if not stats:
+        return None
+    summary = summarize(stats)
+    data_access.save_json(user, year, filename, summary)
+    return summary
+
+
+def report(summary: dict) -> dict:
+    """Readable stats of a (rolled up) summary: counts, percentages, averages and rankings."""
+    totals = summary["totals"]
+    watches = totals["watches"]
+
+    def percent(count: int) -> float:
+        return round(count / watches, 2) if watches else 0.0
+
+    def ranked(groups: dict) -> dict:
+        return {value: counts[0] for value, counts in sorted(groups.items(), key=lambda item: item[1][0], reverse=True)}
+
+    def averages(groups: dict) -> dict:
+        # Same 4+ rated movies rule as the yearly stats, in ranking order
+        return {value: round(groups[value][1] / groups[value][2], 2) for value in ranked(groups) if groups[value][2] >= 4}
+
+    rated = sum(totals["ratings"])
+    lifetime = {
+        "first_year": summary["first_year"],
+        "last_year": summary["last_year"],
+        "movies_per_year": totals["years"],
+        "movie_count": watches,
+        "rewatches": totals["rewatches"],
+        "percent_rewatches": percent(totals["rewatches"]),
+        "reviews": totals["reviews"],
+        "percent_review": percent(totals["reviews"]),
+        "likes": totals["likes"],
+        "percent_liked": percent(totals["likes"]),
+        "minutes_watched": totals["minutes"],
+        "average_legnth": round(totals["minutes"] / watches, 1) if watches else 0,
+        "rating_counts": {str(i / 2): count for i, count in enumerate(totals["ratings"], 1)},
+        "rating_average": round(sum(i / 2 * count for i, count in enumerate(totals["ratings"], 1)) / rated, 1) if rated else 0.0,
+        "monthly_movie_count": totals["months"],
+        "days_of_the_week": totals["weekdays"],
+        "releases": dict(sorted(totals["releases"].items())),
+        "longest_daily_streak": summary["days"]["longest"],
+    }
+    for name, averages_key in GROUPS.items():
+        lifetime[name] = ranked(totals[name])
+        lifetime[averages_key] = averages(totals[name])
+    return lifetime
@@ -0,0 +1,511 @@
+"""pandas backend for StatsCalculator (LETTERBOXD_STATS_BACKEND=pandas).
+
+The master list is loaded once into a typed DataFrame, one row per watch, and
+every section is computed with groupby and vectorized operations instead of
+dict loops. `stats`, and the stats of the default full-movie cutoff, come out
+exactly as StatsCalculator builds them; tests/test_stats_backend.py compares
+the two backends.
+"""
+
+from itertools import chain
+import numpy as np
+import pandas as pd
+from utils.calendar_index import WEEKDAYS, CalendarIndex, calendar_index
+from utils.streaks import find_streaks
+from .stats_calculator import StatsCalculator
+
+
+LIST_FIELDS = ("genres", "country", "language", "studio")
+RATINGS = [float(i/2) for i in range(1, 11)]
+
+
+def master_frame(master_list: dict, full_movie: int, index: CalendarIndex) -> tuple:
+    """One typed row per watch, in master list order, and the genre/country/language/studio listings.
+
+    Listings are {field: DataFrame(row, value)} with one row per listed value; a
+    value listed twice on a film gives two rows.
+    """
+    records = list(master_list.values())
+    dates = [record["date"] for record in records]
+    popularity = [record.get("popularity") or {} for record in records]
+
+    frame = pd.DataFrame({
+        "num": pd.Series(list(master_list.keys()), dtype=object),
+        "name": pd.Series([record["name"] for record in records], dtype=object),
+        "slug": pd.Series([record["slug"] for record in records], dtype=object),
+        "year": np.fromiter((d["year"] for d in dates), dtype=np.int64, count=len(dates)),
+        "month": np.fromiter((d["month"] for d in dates), dtype=np.int64, count=len(dates)),
+        "day": np.fromiter((d["day"] for d in dates), dtype=np.int64, count=len(dates)),
+        "runtime": np.array([np.nan if record["runtime"] == "null" else int(record["runtime"]) for record in records], dtype=np.float64),
+        "rating": np.array([np.nan if record.get("rating") in ("null", None) else float(record["rating"]) for record in records], dtype=np.float64),
+        "rewatched": np.array([record["rewatched"] == True for record in records], dtype=bool),
+        "reviewed": np.array([record["reviewed"] == True for record in records], dtype=bool),
+        "liked": np.array([record["liked"] == True for record in records], dtype=bool),
+        "has_released": np.array([record.get("released", []) != [] for record in records], dtype=bool),
+        "released": pd.Series([record.get("released") for record in records], dtype=object),
+        "has_members": np.array(["members" in pop for pop in popularity], dtype=bool),
+        "members": pd.Series([pop.get("members") for pop in popularity], dtype=object),
+    })
+
+    listings = {}
+    for field in LIST_FIELDS:
+        listed = [record.get(field) or () for record in records]
+        lengths = np.fromiter(map(len, listed), dtype=np.int64, count=len(listed))
+        listings[field] = pd.DataFrame({
+            "row": np.repeat(np.arange(len(listed)), lengths),
+            "value": pd.Series(list(chain.from_iterable(listed)), dtype=object),
+        })
+
+    # Day of year, week and weekday from the calendar index; watches outside its year get 0 / -1
+    in_year = frame["year"].to_numpy() == index.year
+    offsets = np.asarray(index.month_offsets)[frame["month"].to_numpy() - 1] + frame["day"].to_numpy() - 1
+    offsets = np.where(in_year, offsets, 0)
+    frame["yday"] = np.where(in_year, offsets + 1, 0)
+    frame["week"] = np.where(in_year, np.asarray(index.day_week)[offsets], 0)
+    frame["weekday"] = np.where(in_year, np.asarray(index.day_weekday)[offsets], -1)
+    frame["position"] = frame["num"].astype(np.int64)
+    frame["full"] = (frame["runtime"] >= full_movie).to_numpy()
+    return frame, listings
+
+
+def split_lists(codes: np.ndarray, nums: np.ndarray, size: int) -> list:
+    """Movie nums grouped by code (0 to size - 1), each group in row order."""
+    order = np.argsort(codes, kind="stable")
+    bounds = np.searchsorted(codes[order], np.arange(1, size))
+    return [chunk.tolist() for chunk in np.split(nums[order], bounds)]
+
+
+def lists_by(rows: pd.DataFrame, key: str, labels: list, start: int = 1) -> dict:
+    """{label: [movie nums]} for the consecutive int keys start, start + 1, ...; keys without rows get []."""
+    codes = rows[key].to_numpy() - start
+    inside = (codes >= 0) & (codes < len(labels))
+    return dict(zip(labels, split_lists(codes[inside], rows["num"].to_numpy()[inside], len(labels))))
+
+
+def counts_by(rows: pd.DataFrame, key: str, size: int, start: int = 1) -> np.ndarray:
+    codes = rows[key].to_numpy() - start
+    return np.bincount(codes[(codes >= 0) & (codes < size)], minlength=size)
+
+
+def first_seen(codes: np.ndarray) -> np.ndarray:
+    """Codes present in `codes`, in order of first appearance."""
+    present, first = np.unique(codes, return_index=True)
+    return present[np.argsort(first)]
+
+
+def share(count: int, total: int) -> float:
+    """`count` as a fraction of `total`, 0 for a year without movies."""
+    return round(count / total, 2) if total else 0.0
+
+
+def rating_average(rated: np.ndarray) -> float:
+    if len(rated) == 0:
+        return 0.0
+    return round(float(rated.sum()) / len(rated), 1)
+
+
+def most(period_lists: dict, counts: np.ndarray) -> dict:
+    """Periods holding the highest count, ties kept."""
+    top = counts.max() if len(counts) else 0
+    return {period: period_list for (period, period_list), count in zip(period_lists.items(), counts) if count == top}
+
+
+class FrameStatsCalculator(StatsCalculator):
+    """StatsCalculator computing every section with pandas.
+
+    compute() also fills the view of the `full_movie` cutoff, which the frame
+    gets in the same pass. Any other cutoff, or a metric asked for on its own
+    before compute(), goes through the python folds of StatsCalculator.metric().
+    """
+
+    def aggregates(self):
+        # The frame keeps no folds to resume from
+        return None
+
+    def resume(self, aggregates: dict) -> bool:
+        return False
+
+    def compute(self):
+        index = calendar_index(self.year)
+        frame, listings = master_frame(self.master_list, self.full_movie, index)
+        full = frame[frame["full"]]
+
+
+
+        #---------------------------------------Counts---------------------------------------
+
+
+
+        monthly_counts = lists_by(frame, "month", self.all_months)
+        full_monthly_counts = lists_by(full, "month", self.all_months)
+        yearly_count = frame["num"].tolist()
+        full_yearly_count = full["num"].tolist()
+
+        flagged = {}
+        for flag in ("rewatched", "reviewed", "liked"):
+            flagged[flag] = (
+                lists_by(frame[frame[flag]], "month", self.all_months),
+                frame.loc[frame[flag], "num"].tolist(),
+                lists_by(full[full[flag]], "month", self.all_months),
+                full.loc[full[flag], "num"].tolist(),
+            )
+        monthly_rewatch, total_rewatch, full_monthly_rewatch, full_total_rewatch = flagged["rewatched"]
+        monthly_review, total_review, full_monthly_review, full_total_review = flagged["reviewed"]
+        monthly_like, total_like, full_monthly_like, full_total_like = flagged["liked"]
+
+        average_count_monthly = round((len(yearly_count) / 12), 1)
+        full_average_count_monthly = round((len(full_yearly_count) / 12), 1)
+        average_count_weekly = round((len(yearly_count) / 52), 1)
+        full_average_count_weekly = round((len(full_yearly_count) / 52), 1)
+
+        percent_rewatches = share(len(total_rewatch), len(yearly_count))
+        full_percent_rewatches = share(len(full_total_rewatch), len(full_yearly_count))
+        percent_reviewed = share(len(total_review), len(yearly_count))
+        full_percent_reviewed = share(len(full_total_review), len(full_yearly_count))
+        percent_liked = share(len(total_like), len(yearly_count))
+        full_percent_liked = share(len(full_total_like), len(full_yearly_count))
+
+
+
+        #---------------------------------------Ratings---------------------------------------
+
+
+
+        def rating_movies(rows: pd.DataFrame):
+            rated = rows[rows["rating"].notna()]
+            months = rated["month"].to_numpy() - 1
+            ratings = rated["rating"].to_numpy()
+
+            # One group per (month, rating) pair: 12 months x 10 half-star ratings
+            codes = months * len(RATINGS) + (ratings * 2).astype(np.int64) - 1
+            lists = split_lists(codes, rated["num"].to_numpy(), 12 * len(RATINGS))
+            monthly = {
+                month_name: dict(zip(RATINGS, lists[m * len(RATINGS):(m + 1) * len(RATINGS)]))
+                for m, month_name in enumerate(self.all_months)
+            }
+            # Yearly lists are the monthly ones joined in month order
+            yearly = {rating: [num for month_name in self.all_months for num in monthly[month_name][rating]] for rating in RATINGS}
+            monthly_avg = {month_name: rating_average(ratings[months == m]) for m, month_name in enumerate(self.all_months)}
+            return monthly, yearly, monthly_avg, rating_average(ratings)
+
+        monthly_rating_movies, yearly_rating_movies, monthly_avg, yearly_avg = rating_movies(frame)
+        full_monthly_rating_movies, full_yearly_rating_movies, full_monthly_avg, full_yearly_avg = rating_movies(full)
+
+
+
+        #---------------------------------------Watch-Time---------------------------------------
+
+
+
+        def watch_time(rows: pd.DataFrame, monthly_counts: dict):
+            timed = rows[rows["runtime"].notna()]
+            minutes = np.bincount(timed["month"].to_numpy() - 1, weights=timed["runtime"].to_numpy(), minlength=12)
+            monthly = {month_name: int(minutes[m]) for m, month_name in enumerate(self.all_months)}
+            average = {
+                month_name: round(((monthly[month_name] / len(monthly_counts[month_name])) if len(monthly_counts[month_name]) != 0 else 0), 1)
+                for month_name in self.all_months
+            }
+            yearly = sum(monthly.values())
+            return monthly, average, yearly, round(((yearly / len(rows)) if len(rows) != 0 else 0), 1)
+
+        monthly_watch_hours, average_movie_legnth_m, yearly_watch_hours, average_movie_legnth_y = watch_time(frame, monthly_counts)
+        full_monthly_watch_hours, full_average_movie_legnth_m, full_yearly_watch_hours, full_average_movie_legnth_y = watch_time(full, full_monthly_counts)
+
+
+
+        #---------------------------------------Number-Movies---------------------------------------
+
+
+
+        x_movie_watched = {}
+        if not frame.empty:
+            milestones = frame[frame["position"] % 25 == 0]
+            x_movie_watched['1'] = self.master_list['1']['name']
+            x_movie_watched.update(zip(milestones["num"], milestones["name"]))
+            x_movie_watched['last'] = self.master_list[str(len(self.master_list))]['name']
+
+        full_x_movie_watched = {}
+        if not full.empty:
+            full_names = dict(zip(full["num"], full["name"]))
+            full_x_movie_watched['1'] = full_names.get('1')
+            full_milestones = full[full["position"] % 25 == 0]
+            full_x_movie_watched.update(zip(full_milestones["num"], full_milestones["name"]))
+            last_key = str(len(full))
+            if last_key in full_names:
+                full_x_movie_watched['last'] = full_names[last_key]
+
+
+
+        #---------------------------------------Top-Rated/People---------------------------------------
+
+
+
+        def top_movies(rows: pd.DataFrame) -> dict:
+            rated = rows[rows["rating"].notna()]
+            if rated.empty:
+                return {}
+            top = rated[rated["rating"] == rated["rating"].max()]
+            return dict(zip(top["num"], top["name"]))
+
+        def top_people(people: dict) -> dict:
+            return {
+                data["name"]: data["appearances"]
+                for _, data in sorted(people.items(), key=lambda x: x[1]["appearances"], reverse=True)[:10]
+            }
+
+        Top_movies, full_Top_movies = top_movies(frame), top_movies(full)
+        full_cast_list, full_director_list = self.people(self.full_movie)
+        top_actor, full_top_actor = top_people(self.cast_list), top_people(full_cast_list)
+        top_director, full_top_director = top_people(self.director_list), top_people(full_director_list)
+
+
+
+        #---------------------------------------List-Multi-Watches---------------------------------------
+
+
+
+        slug_codes, slugs = pd.factorize(frame["slug"])
+        watches = split_lists(slug_codes, frame["num"].to_numpy(), len(slugs))
+        multiwatches = {slugs[code]: nums for code, nums in enumerate(watches) if len(nums) > 1}
+
+
+
+        #---------------------------------------Weeks/Days---------------------------------------
+
+
+
+        weekly_dates = index.weeks()
+        weekly_movies = lists_by(frame, "week", index.week_labels)
+        full_weekly_movies = lists_by(full, "week", index.week_labels)
+        daily_movies = lists_by(frame, "yday", index.day_labels)
+        days_of_the_week = lists_by(frame, "weekday", WEEKDAYS, start=0)
+
+        # The full day and weekday lists have always followed the last movie's runtime
+        last_is_full = not frame.empty and bool(frame["full"].iloc[-1])
+        full_daily_movies = {day: (list(day_list) if last_is_full else []) for day, day_list in daily_movies.items()}
+        full_days_of_the_week = {name: (list(day_list) if last_is_full else []) for name, day_list in days_of_the_week.items()}
+
+        daily_counts = counts_by(frame, "yday", index.days)
+        weekly_counts = counts_by(frame, "week", len(index.week_labels))
+
+        most_movies_daily = most(daily_movies, daily_counts)
+        most_full_movies_daily = most(daily_movies, counts_by(full, "yday", index.days))
+        most_movies_weekly = most(weekly_movies, weekly_counts)
+        most_full_movies_weekly = most(weekly_movies, counts_by(full, "week", len(index.week_labels)))
+
+        day_streaks = find_streaks(index.day_labels, (daily_counts > 0).tolist())
+        week_streaks = find_streaks(index.week_labels, (weekly_counts > 0).tolist())
+        month_streaks = find_streaks(self.all_months, [len(monthly_counts[month]) > 0 for month in self.all_months])
+
+        consecutive_days, longest_daily_streak = day_streaks["streaks"], day_streaks["longest"]
+        consecutive_weeks, longest_weekly_streak = week_streaks["streaks"], week_streaks["longest"]
+        consecutive_months, longest_monthly_streak = month_streaks["streaks"], month_streaks["longest"]
+
+
+
+        #---------------------------------------Genre/Country/Language/Studio---------------------------------------
+
+
+
+        def grouped(field: str, full_min: int):
+            """Sorted {value: [movie nums]} for all and full movies, and the 4+/full_min+ rated averages."""
+            rows = listings[field]["row"].to_numpy()
+            codes, values = pd.factorize(listings[field]["value"])
+            is_full = frame["full"].to_numpy()[rows]
+
+            # Ranked by every listing (a value listed twice counts twice)
+            sizes = np.bincount(codes, minlength=len(values))
+            full_sizes = np.bincount(codes[is_full], minlength=len(values))
+
+            if field == "language":
+                # ...but each movie is only counted once per language
+                keep = np.zeros(len(codes), dtype=bool)
+                keep[np.unique(rows * len(values) + codes, return_index=True)[1]] = True
+                codes, is_full, rows = codes[keep], is_full[keep], rows[keep]
+
+            nums = frame["num"].to_numpy()[rows]
+            ratings = frame["rating"].to_numpy()[rows]
+
+            def by_count(mask: np.ndarray, ranking: np.ndarray) -> dict:
+                lists = split_lists(codes[mask], nums[mask], len(values))
+                order = first_seen(codes[mask])
+                order = order[np.argsort(-ranking[order], kind="stable")]
+                return {values[code]: lists[code] for code in order}
+
+            value_dict = by_count(np.ones(len(codes), dtype=bool), sizes)
+            full_value_dict = by_count(is_full, full_sizes)
+
+            rated = ~np.isnan(ratings)
+            totals = np.bincount(codes[rated], weights=ratings[rated], minlength=len(values))
+            num = np.bincount(codes[rated], minlength=len(values))
+            full_totals = np.bincount(codes[rated & is_full], weights=ratings[rated & is_full], minlength=len(values))
+            full_num = np.bincount(codes[rated & is_full], minlength=len(values))
+
+            averages, full_averages = {}, {}
+            for code in (values.get_loc(value) for value in value_dict):
+                if num[code] >= 4:
+                    averages[values[code]] = round(float(totals[code]) / int(num[code]), 2)
+                if full_num[code] >= full_min:
+                    full_averages[values[code]] = round(float(full_totals[code]) / int(full_num[code]), 2)
+            return value_dict, full_value_dict, averages, full_averages
+
+        genre_dict, full_genre_dict, genre_averages, full_genre_averages = grouped("genres", 4)
+        country_dict, full_country_dict, country_averages, full_country_averages = grouped("country", 5)
+        language_dict, full_language_dict, language_averages, full_language_averages = grouped("language", 5)
+        studio_dict, full_studio_dict, studio_averages, full_studio_averages = grouped("studio", 4)
+
+
+
+        #---------------------------------------Release-Year---------------------------------------
+
+
+
+        def releases(rows: pd.DataFrame) -> dict:
+            released = rows[rows["has_released"]]
+            # Grouping on the codes keeps int years from becoming floats when some are None
+            codes, years = pd.factorize(released["released"], use_na_sentinel=False)
+            lists = split_lists(codes, released["num"].to_numpy(), len(years))
+            return {(None if pd.isna(year) else year): nums for year, nums in zip(years, lists)}
+
+        release_dict, full_release_dict = releases(frame), releases(full)
+
+        current_year = frame["has_released"] & (frame["released"] == self.year)
+        percent_current_year = share(int(current_year.sum()), len(yearly_count))
+        full_percent_current_year = share(int((current_year & frame["full"]).sum()), len(full_yearly_count))
+
+
+
+        #---------------------------------------Rarest/popular---------------------------------------
+
+
+
+        def rarest_popular(rows: pd.DataFrame):
+            counted = rows[rows["has_members"]]
+            nums, members = counted["num"].to_numpy(), counted["members"].to_numpy()
+            keys = np.array([int(m) for m in members], dtype=np.int64)
+            ascending = np.argsort(keys, kind="stable")
+            descending = ascending[np.argsort(-keys[ascending], kind="stable")]
+            return dict(zip(nums[ascending], members[ascending])), dict(zip(nums[descending], members[descending]))
+
+        rarest, popular = rarest_popular(frame)
+        full_rarest, full_popular = rarest_popular(full)
+
+
+
+        #---------------------------------------List---------------------------------------
+
+
+
+        self.stats['info'] = self.info()
+
+        self.stats['stats'] = {
+            "monthly_movie_count": monthly_counts,
+            "yearly_movie_count": yearly_count,
+            "average_count_monthly": average_count_monthly,
+            "average_count_weekly": average_count_weekly,
+            "monthly_rewatch": monthly_rewatch,
+            "yearly_rewatch": total_rewatch,
+            "percent_rewatches": percent_rewatches,
+            "monthly_review": monthly_review,
+            "yearly_review": total_review,
+            "percent_review": percent_reviewed,
+            "monthly_like": monthly_like,
+            "yearly_like": total_like,
+            "percent_liked": percent_liked,
+            "yearly_rating_movies": yearly_rating_movies,
+            "monthly_rating_movies": monthly_rating_movies,
+            "monthly_rating_average": monthly_avg,
+            "yearly_rating_average": yearly_avg,
+            "yearly_minutes_watched": yearly_watch_hours,
+            "yearly_average_legnth": average_movie_legnth_y,
+            "monthly_minutes_watched": monthly_watch_hours,
+            "average_minutes_watched_monthly": average_movie_legnth_m,
+            "X_movie_watched": x_movie_watched,
+            "top_movies": Top_movies,
+            "top_actors_10": top_actor,
+            "top_directors_10": top_director,
+            "multiwatches": multiwatches,
+            "num_per_week": weekly_movies,
+            "num_per_day": daily_movies,
+            "days_of_the_week": days_of_the_week,
+            "genres": genre_dict,
+            "genre_averages": genre_averages,
+            "country": country_dict,
+            "country_averages": country_averages,
+            "language": language_dict,
+            "language_averages": language_averages,
+            "studio": studio_dict,
+            "studio_averages": studio_averages,
+            "releases": release_dict,
+            "percent_current_years": percent_current_year,
+            "rarest_movies": rarest,
+            "popular_movies": popular,
+            "most_movies_daily": most_movies_daily,
+            "most_movies_weekly": most_movies_weekly,
+            "consecutive_days": consecutive_days,
+            "longest_daily_streak": longest_daily_streak,
+            "consecutive_weeks": consecutive_weeks,
+            "longest_weekly_streak": longest_weekly_streak,
+            "consecutive_months": consecutive_months,
+            "longest_monthly_streak": longest_monthly_streak,
+            "weeks list": weekly_dates
+        }
+
+        full_stats = {
+            "monthly_movie_count": full_monthly_counts,
+            "yearly_movie_count": full_yearly_count,
+            "average_count_monthly": full_average_count_monthly,
+            "average_count_weekly": full_average_count_weekly,
+            "monthly_rewatch": full_monthly_rewatch,
+            "yearly_rewatch": full_total_rewatch,
+            "percent_rewatches": full_percent_rewatches,
+            "monthly_review": full_monthly_review,
+            "yearly_review": full_total_review,
+            "percent_review": full_percent_reviewed,
+            "monthly_like": full_monthly_like,
+            "yearly_like": full_total_like,
+            "percent_liked": full_percent_liked,
+            "yearly_rating_movies": full_yearly_rating_movies,
+            "monthly_rating_movies": full_monthly_rating_movies,
+            "monthly_rating_average": full_monthly_avg,
+            "yearly_rating_average": full_yearly_avg,
+            "yearly_minutes_watched": full_yearly_watch_hours,
+            "yearly_average_legnth": full_average_movie_legnth_y,
+            "monthly_minutes_watched": full_monthly_watch_hours,
+            "average_minutes_watched_monthly": full_average_movie_legnth_m,
+            "X_movie_watched": full_x_movie_watched,
+            "top_movies": full_Top_movies,
+            "top_actors_10": full_top_actor,
+            "top_directors_10": full_top_director,
+            "multiwatches": multiwatches,
+            "num_per_week": full_weekly_movies,
+            "num_per_day": full_daily_movies,
+            "days_of_the_week": full_days_of_the_week,
+            "genres": full_genre_dict,
+            "genre_averages": full_genre_averages,
+            "country": full_country_dict,
+            "country_averages": full_country_averages,
+            "language": full_language_dict,
+            "language_averages": full_language_averages,
+            "studio": full_studio_dict,
+            "studio_averages": full_studio_averages,
+            "releases": full_release_dict,
+            "percent_current_years": full_percent_current_year,
+            "rarest_movies": full_rarest,
+            "popular_movies": full_popular,
+            "most_movies_daily": most_full_movies_daily,
+            "most_movies_weekly": most_full_movies_weekly,
+            "consecutive_days": consecutive_days,
+            "longest_daily_streak": longest_daily_streak,
+            "consecutive_weeks": consecutive_weeks,
+            "longest_weekly_streak": longest_weekly_streak,
+            "consecutive_months": consecutive_months,
+            "longest_monthly_streak": longest_monthly_streak,
+            "weeks list": weekly_dates
+        }
+
+        # Single metrics asked for later come from here rather than from the python folds
+        for min_runtime, stats in ((0, self.stats['stats']), (self.full_movie, full_stats)):
+            self._values.update({(name, min_runtime): value for name, value in stats.items()})
+
+        return self.stats
@@ -1,6 +1,6 @@
-import json
 from pathlib import Path
 from typing import Any
+from utils import serialization
 
 
 class DataAccess:
@@ -29,8 +29,7 @@ class DataAccess:
     def save_json(self, user: str, year: int, filename: str, data: Any) -> str:
         """Save `data` as JSON to cache and return the saved path as a string."""
         path = self._make_cache_path(user, year, filename)
-        with open(path, "w", encoding="utf-8") as fh:
-            json.dump(data, fh, ensure_ascii=False, indent=2)
+        serialization.write_file(path, data)
         return str(path)
 
     def load_json(self, user: str, year: int, filename: str) -> Any:
@@ -39,7 +38,6 @@ class DataAccess:
         if not path.exists():
             return None
         try:
-            with open(path, "r", encoding="utf-8") as fh:
-                return json.load(fh)
+            return serialization.read_file(path)
         except Exception:
             return None
@@ -0,0 +1,68 @@
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from utils.http_replay import FixtureStore, StandInServer, record, replay
+from utils.fetch_engine import configure_engine
+from analysis.data_fetcher import DiaryFetcher
+from analysis.movie_master_builder import MovieMasterListBuilder
+
+
+def run_fetch(user: str, year: int):
+    """Run both fetch stages from scratch in an empty cache (current directory)."""
+    diary = DiaryFetcher(user, year, trace=False).fetch(force_refresh=True)
+    master, *_ = MovieMasterListBuilder(user, year, diary, trace=False).build(force_refresh=True)
+    return diary, master
+
+
+def in_temp_cache(fn, *args):
+    # DataAccess and FilmStore use ./cache, so a temp cwd keeps runs cold and the real cache untouched
+    cwd = os.getcwd()
+    tmp = tempfile.mkdtemp(prefix="letterboxd_bench_")
+    os.chdir(tmp)
+    try:
+        return fn(*args)
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the fetch stages against recorded Letterboxd pages")
+    parser.add_argument("--user", required=True, help="Letterboxd username")
+    parser.add_argument("--year", type=int, default=2025, help="Year to fetch")
+    parser.add_argument("--fixtures", default="fixtures/letterboxd", help="Fixture store directory")
+    parser.add_argument("--record", action="store_true", help="Fetch from letterboxd.com and record the pages")
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds added to every replayed response")
+    parser.add_argument("--jitter", type=float, default=0.1, help="Extra random latency, up to this many seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of replayed requests answered with an error")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for latency jitter and error injection")
+    parser.add_argument("--max-in-flight", type=int, nargs="+", default=[2, 4, 8, 16], help="Concurrency settings to compare")
+    parser.add_argument("--requests-per-second", type=float, default=1000.0, help="Rate limit during replay")
+
+    args = parser.parse_args()
+    store = FixtureStore(str(Path(args.fixtures).resolve()))
+
+    if args.record:
+        with record(store):
+            in_temp_cache(run_fetch, args.user, args.year)
+        print(f"Recorded {len(store.index)} pages to {store.root}")
+        return
+
+    print(f"{'in flight':>10} {'seconds':>8} {'requests':>9} {'errors':>7} {'films':>6} {'req/s':>7}")
+    for max_in_flight in args.max_in_flight:
+        configure_engine(max_in_flight=max_in_flight, requests_per_second=args.requests_per_second)
+
+        with StandInServer(store, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate, seed=args.seed) as server:
+            with replay(server):
+                start = time.perf_counter()
+                _, master = in_temp_cache(run_fetch, args.user, args.year)
+                seconds = time.perf_counter() - start
+
+        print(f"{max_in_flight:>10} {seconds:>8.2f} {server.requests_served:>9} {server.errors_served:>7} {len(master):>6} {server.requests_served / seconds:>7.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+import argparse
+import os
+from utils.cache_gc import CacheGC, parse_size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Remove superseded cache files and evict data over a size budget")
+    parser.add_argument("--cache-dir", default="cache", help="Cache directory to clean")
+    parser.add_argument("--max-bytes", type=parse_size, help='Size budget, e.g. "500MB"; without it only superseded files are removed')
+    parser.add_argument("--dry-run", action="store_true", help="Only list what would be removed")
+
+    args = parser.parse_args()
+    if os.getenv("LETTERBOXD_CACHE_BACKEND", "json") != "json":
+        raise SystemExit("cache_gc.py only manages the json file cache")
+
+    gc = CacheGC(args.cache_dir, dry_run=args.dry_run)
+    result = gc.run(max_bytes=args.max_bytes)
+
+    for path in gc.removed:
+        print(f"{'Would remove' if args.dry_run else 'Removed'} {path}")
+    print(f"{result['files']} files, {result['before'] / 1e6:.2f} MB -> {result['after'] / 1e6:.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+import argparse
+import os
+from utils import columnar
+from utils.data_access import get_data_access
+
+
+def cached_years(data_access, cache_dir: str):
+    """Yield (user, year) for every user/year in the cache."""
+    if hasattr(data_access, "list_users"):
+        for user in data_access.list_users():
+            for year in data_access.list_years(user):
+                yield user, year
+        return
+
+    for user in sorted(os.listdir(cache_dir)):
+        user_dir = os.path.join(cache_dir, user)
+        if user.startswith("_") or not os.path.isdir(user_dir):
+            continue
+        for year in sorted(os.listdir(user_dir)):
+            if os.path.isdir(os.path.join(user_dir, year)):
+                yield user, year
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export every cached master list and credits to the Parquet dataset")
+    parser.add_argument("--cache-dir", default="cache", help="Cache directory to export")
+
+    args = parser.parse_args()
+    if columnar.pa is None:
+        raise SystemExit("Exporting the Parquet dataset needs the 'pyarrow' package")
+
+    data_access = get_data_access(args.cache_dir)
+    for user, year in cached_years(data_access, args.cache_dir):
+        master_list = data_access.load_json(user, year, f"{user}_{year}_master.json")
+        if not master_list:
+            continue
+
+        credits = data_access.load_json(user, year, f"{user}_{year}_credits.json")
+        columnar.export_year(user, year, master_list, credits, base_cache_dir=args.cache_dir)
+        print(f"Exported {user} {year}: {len(master_list)} watches" + ("" if credits else " (no credits cached, rebuild to include them)"))
+
+    print(f"Dataset written to {os.path.join(args.cache_dir, '_dataset')}")
+
+
+if __name__ == "__main__":
+    main()
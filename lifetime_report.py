@@ -0,0 +1,45 @@
+import argparse
+import json
+from analysis.rollup import load_summary, report, rollup
+from utils.data_access import get_data_access
+from export_dataset import cached_years
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lifetime (or multi-year) stats of a user, rolled up from the cached yearly stats")
+    parser.add_argument("--user", required=True, help="Letterboxd username")
+    parser.add_argument("--first-year", type=int, help="First year to include (default: the oldest cached year)")
+    parser.add_argument("--last-year", type=int, help="Last year to include (default: the latest cached year)")
+    parser.add_argument("--cache-dir", default="cache", help="Cache directory to read")
+    parser.add_argument("--output", help="Write the report JSON here instead of printing it")
+
+    args = parser.parse_args()
+    data_access = get_data_access(args.cache_dir)
+
+    summaries = []
+    for user, year in cached_years(data_access, args.cache_dir):
+        if user != args.user or not str(year).isdigit():
+            continue
+        if (args.first_year and int(year) < args.first_year) or (args.last_year and int(year) > args.last_year):
+            continue
+        summary = load_summary(data_access, user, year)
+        if summary is None:
+            print(f"No stats cached for {user} {year}, run main.py for that year first")
+            continue
+        summaries.append(summary)
+
+    lifetime = rollup(summaries)
+    if lifetime is None:
+        raise SystemExit(f"No cached stats for {args.user} in that range")
+
+    output = json.dumps(report(lifetime), ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+        print(f"Saved {lifetime['first_year']}–{lifetime['last_year']} stats of {args.user} to {args.output}")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
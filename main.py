@@ -1,20 +1,80 @@
 import argparse
-from analysis.orchestrator import LetterboxdAnalysis
+import os
+from analysis.orchestrator import LetterboxdAnalysis, MultiYearAnalysis
+from analysis.batch import BatchAnalysis
+from utils.fetch_engine import configure_engine
+from utils.cache_gc import CacheGC, parse_size
 from report.dashboard import app
 
+def parse_years(value: str) -> list:
+    """Parse "2019-2025" or "2019,2021,2023" into a list of years."""
+    years = []
+    for part in value.split(","):
+        if "-" in part:
+            start, end = part.split("-")
+            years.extend(range(int(start), int(end) + 1))
+        else:
+            years.append(int(part))
+    return years
+
 def main():
     parser = argparse.ArgumentParser(description="Analyze your Letterboxd data")
-    parser.add_argument("--user", required=True, help="Letterboxd username")
+    users = parser.add_mutually_exclusive_group(required=True)
+    users.add_argument("--user", help="Letterboxd username")
+    users.add_argument("--users", type=lambda v: v.split(","), help="Comma separated usernames to run as a batch")
     parser.add_argument("--year", type=int, default=2025, help="Year to analyze")
+    parser.add_argument("--years", type=parse_years, help="Several years to analyze in one run, e.g. 2019-2025")
     parser.add_argument("--force-refresh", action="store_true", help="Force API refresh")
+    parser.add_argument("--incremental", action="store_true", help="Only re-fetch diary months that may have changed")
+    parser.add_argument("--offline", action="store_true", help="Use cached data only, never contact Letterboxd")
+    parser.add_argument("--defer-watchers", action="store_true", help="Fetch watcher stats after the first report instead of with each film")
     parser.add_argument("--summary-only", action="store_true", help="Skip detailed output")
     parser.add_argument("--report", action="store_true", help="produces online report")
     parser.add_argument("--trace", action="store_true", help="Enable detailed tracing output")
+    parser.add_argument("--max-in-flight", type=int, default=8, help="Max Letterboxd requests running at once")
+    parser.add_argument("--requests-per-second", type=float, default=8.0, help="Max Letterboxd requests started per second")
+    parser.add_argument("--cache-backend", choices=["json", "sqlite"], help="Cache storage backend (default: LETTERBOXD_CACHE_BACKEND or json)")
+    parser.add_argument("--cache-format", help='Cache file format, e.g. "json", "orjson", "msgpack+zstd" (default: LETTERBOXD_CACHE_FORMAT or json)')
+    parser.add_argument("--stats-backend", choices=["python", "pandas"], help="Stats computation backend (default: LETTERBOXD_STATS_BACKEND or python)")
+    parser.add_argument("--workers", type=int, default=4, help="Worker processes for --users batch runs")
+    parser.add_argument("--cache-budget", type=parse_size, default=os.getenv("LETTERBOXD_CACHE_BUDGET"), help='Evict cache data after the run to stay under this size, e.g. "500MB"')
 
     args = parser.parse_args()
 
-    analysis = LetterboxdAnalysis(args.user, args.year, trace=args.trace)
-    analysis.run(force_refresh=args.force_refresh, summary_only=args.summary_only)
+    if args.offline and (args.force_refresh or args.incremental):
+        parser.error("--offline cannot be combined with --force-refresh or --incremental")
+
+    # Set through the environment so batch worker processes and the dashboard pick it up too
+    if args.offline:
+        os.environ["LETTERBOXD_OFFLINE"] = "1"
+    if args.cache_backend:
+        os.environ["LETTERBOXD_CACHE_BACKEND"] = args.cache_backend
+    if args.cache_format:
+        os.environ["LETTERBOXD_CACHE_FORMAT"] = args.cache_format
+    if args.stats_backend:
+        os.environ["LETTERBOXD_STATS_BACKEND"] = args.stats_backend
+
+    configure_engine(max_in_flight=args.max_in_flight, requests_per_second=args.requests_per_second)
+
+    if args.users:
+        analysis = BatchAnalysis(
+            args.users,
+            args.years or [args.year],
+            workers=args.workers,
+            max_in_flight=args.max_in_flight,
+            requests_per_second=args.requests_per_second,
+            trace=args.trace,
+        )
+    elif args.years:
+        analysis = MultiYearAnalysis(args.user, args.years, trace=args.trace)
+    else:
+        analysis = LetterboxdAnalysis(args.user, args.year, trace=args.trace)
+    analysis.run(force_refresh=args.force_refresh, summary_only=args.summary_only, incremental=args.incremental, defer_watchers=args.defer_watchers)
+
+    if args.cache_budget is not None and os.getenv("LETTERBOXD_CACHE_BACKEND", "json") == "json":
+        result = CacheGC().run(max_bytes=args.cache_budget)
+        if args.trace:
+            print(f"Cache GC freed {result['freed'] / 1e6:.2f} MB ({result['files']} files), cache is {result['after'] / 1e6:.2f} MB")
 
     
     if args.report:
@@ -47,10 +107,20 @@ if __name__ == "__main__":
     To Run Type ctrl + `
     Then paste: python main.py --user bonnegarcons --year 2024 --trace --force-refresh --report
     --user:          is required;       type in your python username
+    --users:         replaces --user;   comma separated usernames run as a batch across worker processes
+    --cache-backend: is not required;   json (one file per artifact) or sqlite (cache/cache.sqlite3)
+    --cache-format:  is not required;   json, orjson or msgpack, optionally +gzip/+zstd (convert old caches with migrate_cache.py)
+    --workers:       is not required;   number of worker processes for --users (default 4)
+    --cache-budget:  is not required;   evicts cache data after the run to stay under e.g. 500MB (or run cache_gc.py)
     --year:          is not required;   will default to 2025
+    --years:         is not required;   several years in one run, e.g. 2019-2025 or 2023,2025 (overrides --year)
     --force-refresh: is not requred;    just will update the saved data
+    --incremental:   is not required;   only re-fetches the current, recently edited and unseen diary months
+    --defer-watchers: is not required;  builds stats without watcher stats first, then fills them in and recomputes
     --summary-only:  is not required;   skips detailed master list output
     --trace:         is not requred;    adds trace back allowing you to see how long things are taking
+    --max-in-flight: is not required;   max requests running at once (default 8)
+    --requests-per-second: is not required; request rate limit shared by every fetch (default 8)
     --report:        is not required;    opens the online report dashboard
     ★⯨
     Usernames:
@@ -0,0 +1,44 @@
+import argparse
+from pathlib import Path
+from utils import serialization
+from utils.file_lock import atomic_write, locked
+from utils.manifest import CacheManifest
+
+
+def migrate(cache_dir: str, cache_format: str, dry_run: bool = False):
+    """Rewrite every cache file under `cache_dir` in `cache_format`."""
+    serialization.parse_format(cache_format)
+
+    before = after = files = 0
+    for path in sorted(Path(cache_dir).rglob("*.json")):
+        with locked(path, shared=True):
+            raw = path.read_bytes()
+        encoded = serialization.dumps(serialization.loads(raw), cache_format)
+
+        before += len(raw)
+        after += len(encoded)
+        files += 1
+
+        if not dry_run:
+            atomic_write(path, encoded)
+
+    if not dry_run:
+        # Sizes and hashes changed with the encoding
+        CacheManifest(cache_dir).rebuild()
+
+    action = "Would rewrite" if dry_run else "Rewrote"
+    print(f"{action} {files} files as {cache_format}: {before / 1e6:.2f} MB -> {after / 1e6:.2f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert the cache to another serialization format")
+    parser.add_argument("--format", required=True, help='Target format, e.g. "json", "orjson", "msgpack+zstd", "json+gzip"')
+    parser.add_argument("--cache-dir", default="cache", help="Cache directory to convert")
+    parser.add_argument("--dry-run", action="store_true", help="Only report the size change")
+
+    args = parser.parse_args()
+    migrate(args.cache_dir, args.format, dry_run=args.dry_run)
+
+
+if __name__ == "__main__":
+    main()
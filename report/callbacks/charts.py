@@ -182,7 +182,6 @@ def register_chart_callbacks(app, stats, diary_data):
         if not selected_user or not selected_year:
             return {}
         
-        full_stats = (movie_filter == "full")
         diary = load_diary(
             cache_dir=str(CACHE_DIR),
             profile=selected_user,
@@ -198,12 +197,11 @@ def register_chart_callbacks(app, stats, diary_data):
         if not selected_user or not selected_year:
             return {}
         
-        full_stats = (movie_filter == "full")
         stats = load_stats(
             cache_dir=str(CACHE_DIR),
             profile=selected_user,
             year=int(selected_year),
-            full_stats=full_stats,
+            min_runtime=movie_filter,
         )
         return create_weekly_distribution(stats)
     
@@ -215,12 +213,11 @@ def register_chart_callbacks(app, stats, diary_data):
         if not selected_user or not selected_year:
             return {}
         
-        full_stats = (movie_filter == "full")
         stats = load_stats(
             cache_dir=str(CACHE_DIR),
             profile=selected_user,
             year=int(selected_year),
-            full_stats=full_stats,
+            min_runtime=movie_filter,
         )
         return create_country_world_map(stats)
         
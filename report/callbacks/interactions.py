@@ -88,12 +88,11 @@ def register_interaction_callbacks(app, stats, diary_data):
         if not selected_user or not selected_year:
             return "Select a user and year to begin"
 
-        full_stats = (movie_filter == "full")
         stats = load_stats(
             cache_dir=str(CACHE_DIR),
             profile=selected_user,
             year=int(selected_year),
-            full_stats=full_stats,
+            min_runtime=movie_filter,
         )
 
         return header_component(stats)
@@ -106,12 +105,11 @@ def register_interaction_callbacks(app, stats, diary_data):
         if not selected_user or not selected_year:
             return "Select a user and year to begin"
 
-        full_stats = (movie_filter == "full")
         stats = load_stats(
             cache_dir=str(CACHE_DIR),
             profile=selected_user,
             year=int(selected_year),
-            full_stats=full_stats,
+            min_runtime=movie_filter,
         )
 
         return average_movies_per_month(stats)
@@ -124,15 +122,13 @@ def register_interaction_callbacks(app, stats, diary_data):
         if not selected_user or not selected_year:
             return "Select a user and year to begin"
 
-        full_stats = (movie_filter == "full")
-
         most_highest = (most_highest == "most")
 
         stats = load_stats(
             cache_dir=str(CACHE_DIR),
             profile=selected_user,
             year=int(selected_year),
-            full_stats=full_stats,
+            min_runtime=movie_filter,
         )
 
         return demographic_charts(stats, most_highest)
@@ -145,13 +141,11 @@ def register_interaction_callbacks(app, stats, diary_data):
         if not selected_user or not selected_year:
             return "Select a user and year to begin"
 
-        full_stats = (movie_filter == "full")
-
         stats = load_stats(
             cache_dir=str(CACHE_DIR),
             profile=selected_user,
             year=int(selected_year),
-            full_stats=full_stats,
+            min_runtime=movie_filter,
         )
 
         return percent_charts(stats)
\ No newline at end of file
@@ -1,21 +1,87 @@
-import json
+import os
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
+from analysis.stats_calculator import StatsCalculator
+from utils import serialization
+from utils.credits import credits_from_people_lists
+from utils.data_access import get_data_access
+from utils.manifest import CacheManifest
 
 """
 data_loader.py
 
 Responsible for:
 - Loading the stats.json file created by the analysis code.
+- Narrowing it to a runtime cutoff ("full movies only" and friends), computed
+  on demand from the cached master list instead of a second stats file.
 - Providing helper functions to access or preprocess the data.
 """
 
+_manifests = {}
+
+def _manifest(cache_base) -> CacheManifest:
+    # One manifest per cache dir, so callbacks reuse the parsed file until it changes
+    key = str(cache_base)
+    if key not in _manifests:
+        _manifests[key] = CacheManifest(key)
+    return _manifests[key]
+
+
+def _load_from_sqlite(cache_base: Path, profile: str, year: int, filename: str) -> dict:
+    from utils.sqlite_store import SQLiteDataAccess
+
+    data = SQLiteDataAccess(str(cache_base)).load_json(profile, year, filename)
+    if data is None:
+        raise FileNotFoundError(f"No {filename} for profile='{profile}' year={year} in the SQLite cache")
+    return data
+
+
+@lru_cache(maxsize=8)
+def _view_calculator(cache_dir: str, profile: str, year: int, master_version) -> StatsCalculator:
+    """One calculator per cached master list, so every callback's cutoff shares its folds."""
+    data_access = get_data_access(cache_dir)
+    master_list = data_access.load_json(profile, year, f"{profile}_{year}_master.json")
+    if not master_list:
+        raise FileNotFoundError(f"No master list for profile='{profile}' year={year} to filter the stats by runtime")
+
+    credits = data_access.load_json(profile, year, f"{profile}_{year}_credits.json")
+    if credits is None:
+        # Years cached before credits still have their cast and director lists
+        cast_list = data_access.load_json(profile, year, f"{profile}_{year}_cast.json")
+        director_list = data_access.load_json(profile, year, f"{profile}_{year}_director.json")
+        credits = credits_from_people_lists(cast_list, director_list)
+    return StatsCalculator({}, master_list, {}, {}, year, profile, credits=credits)
+
+
+def _master_version(cache_base: Path, profile: str, year: int):
+    """Changes whenever the master list of `profile`'s `year` is rewritten, in the active backend."""
+    if os.getenv("LETTERBOXD_CACHE_BACKEND") == "sqlite":
+        from utils.sqlite_store import database_version
+
+        # SQLite writes never reach the JSON manifest
+        return database_version(str(cache_base))
+    entry = _manifest(cache_base).entry(profile, year, f"{profile}_{year}_master.json")
+    if entry is None:
+        return None
+    # Before the pipeline writes a manifest, entries are listed without hashes
+    return entry["sha256"] or (entry["updated_at"], entry["size"])
+
+
+def runtime_view(cache_base: Path, stats: dict, min_runtime: int) -> dict:
+    """`stats` restricted to movies at least `min_runtime` minutes long; each key is computed when first read."""
+    profile, year = stats["info"]["username"], int(stats["info"]["year"])
+    # A rebuilt master list has another version, so its calculator is not reused
+    calculator = _view_calculator(str(cache_base), profile, year, _master_version(cache_base, profile, year))
+    return {"info": stats["info"], "stats": calculator.view(min_runtime)}
+
+
 def load_stats(
     stats_path: Optional[str] = None,
     cache_dir: str = "../cache",
     profile: Optional[str] = None,
     year: Optional[int] = None,
-    full_stats: bool = False,
+    min_runtime: int = 0,
 ) -> dict:
     
     base = Path(__file__).resolve().parent
@@ -31,39 +97,38 @@ def load_stats(
 
         # If profile+year specified, prefer the well-known filename layout
         if profile:
+            if year and os.getenv("LETTERBOXD_CACHE_BACKEND") == "sqlite":
+                data = _load_from_sqlite(cache_base, profile, year, f"{profile}_{year}_stats.json")
+                return runtime_view(cache_base, data, min_runtime) if min_runtime else data
             if year:
-                suffix = "_full_stats.json" if full_stats else "_stats.json"
-                candidate = cache_base / profile / str(year) / f"{profile}_{year}{suffix}"
+                candidate = cache_base / profile / str(year) / f"{profile}_{year}_stats.json"
                 if candidate.exists():
                     stats_file = candidate
+                    # Dashboard reads keep this year at the back of the cache GC's eviction order
+                    _manifest(cache_base).touch(profile, year)
                 else:
                     raise FileNotFoundError(
                         f"No stats file for profile='{profile}' year={year} at {candidate}"
                     )
             else:
-                profile_dir = cache_base / profile
-                if not profile_dir.exists():
-                    raise FileNotFoundError(f"Profile cache directory not found: {profile_dir}")
-
-                suffix = "*_full_stats.json" if full_stats else "*_stats.json"
-                matches = list(profile_dir.rglob(f"{profile}_{suffix}"))
-                if not matches:
+                latest = _manifest(cache_base).latest("stats", user=profile)
+                if latest is None:
                     raise FileNotFoundError(f"No stats files found for profile: {profile}")
 
-                stats_file = max(matches, key=lambda p: p.stat().st_mtime)
+                stats_file = Path(latest)
         else:
-            # No profile specified: search the whole cache for any *_stats.json
-            suffix = "*_full_stats.json" if full_stats else "*_stats.json"
-            matches = list(cache_base.rglob(suffix))
-            if not matches:
+            # No profile specified: the manifest knows the most recently written stats file
+            latest = _manifest(cache_base).latest("stats")
+            if latest is None:
                 raise FileNotFoundError(f"No stats files found under cache: {cache_base}")
 
-            # If more than one, pick the most recently modified
-            stats_file = max(matches, key=lambda p: p.stat().st_mtime)
+            stats_file = Path(latest)
 
-    with open(stats_file, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    # Cache files may be compact JSON, msgpack and/or compressed; the format is detected
+    data = serialization.read_file(stats_file)
 
+    if min_runtime:
+        return runtime_view(base / cache_dir, data, min_runtime)
     return data
 
 
@@ -87,6 +152,8 @@ def load_diary(
 
         # If profile+year specified, prefer the well-known filename layout
         if profile:
+            if year and os.getenv("LETTERBOXD_CACHE_BACKEND") == "sqlite":
+                return _load_from_sqlite(cache_base, profile, year, f"diary_data_{profile}_{year}.json")
             if year:
                 candidate = cache_base / profile / str(year) / f"diary_data_{profile}_{year}.json"
                 if candidate.exists():
@@ -96,25 +163,19 @@ def load_diary(
                         f"No diary file for profile='{profile}' year={year} at {candidate}"
                     )
             else:
-                profile_dir = cache_base / profile
-                if not profile_dir.exists():
-                    raise FileNotFoundError(f"Profile cache directory not found: {profile_dir}")
-
-                matches = list(profile_dir.rglob(f"diary_data_{profile}_*.json"))
-                if not matches:
+                latest = _manifest(cache_base).latest("diary", user=profile)
+                if latest is None:
                     raise FileNotFoundError(f"No diary files found for profile: {profile}")
 
-                diary_file = max(matches, key=lambda p: p.stat().st_mtime)
+                diary_file = Path(latest)
         else:
-            # No profile specified: search the whole cache for any diary_data_*.json
-            matches = list(cache_base.rglob("diary_data_*.json"))
-            if not matches:
+            # No profile specified: the manifest knows the most recently written diary
+            latest = _manifest(cache_base).latest("diary")
+            if latest is None:
                 raise FileNotFoundError(f"No diary files found under cache: {cache_base}")
 
-            # If more than one, pick the most recently modified
-            diary_file = max(matches, key=lambda p: p.stat().st_mtime)
+            diary_file = Path(latest)
 
-    with open(diary_file, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    data = serialization.read_file(diary_file)
 
     return data
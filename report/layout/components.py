@@ -1,6 +1,7 @@
 from dash import dcc, html, Input, Output
 import os
 from pathlib import Path
+from utils.manifest import CacheManifest
 from report.callbacks.charts import create_2025_pie, create_day_of_week, create_genre_chart, create_country_chart, create_language_chart, create_studio_chart, review_pie, rewatches_pie
 
 
@@ -8,19 +9,33 @@ from report.callbacks.charts import create_2025_pie, create_day_of_week, create_
 
 
 
+_manifests = {}
+
+def _manifest(cache_dir):
+    # One manifest per cache dir, so dropdown changes reuse the parsed file until it changes
+    key = str(cache_dir)
+    if key not in _manifests:
+        _manifests[key] = CacheManifest(key)
+    return _manifests[key]
+
 def get_available_users():
     """Get list of available users from cache directory."""
     cache_dir = Path(__file__).resolve().parent.parent.parent / "cache"
+    if os.getenv("LETTERBOXD_CACHE_BACKEND") == "sqlite":
+        from utils.sqlite_store import SQLiteDataAccess
+        return SQLiteDataAccess(str(cache_dir)).list_users() or ["gsilvio"]
     if cache_dir.exists():
-        return [d.name for d in cache_dir.iterdir() if d.is_dir()]
+        return _manifest(cache_dir).users()
     return ["gsilvio"]  # fallback if cache doesn't exist
 
 def get_available_years(user):
     """Get list of available years for a specific user from cache directory."""
     cache_dir = Path(__file__).resolve().parent.parent.parent / "cache" / user
+    if os.getenv("LETTERBOXD_CACHE_BACKEND") == "sqlite":
+        from utils.sqlite_store import SQLiteDataAccess
+        return SQLiteDataAccess(str(cache_dir.parent)).list_years(user)
     if cache_dir.exists():
-        years = [d.name for d in cache_dir.iterdir() if d.is_dir()]
-        return sorted(years, reverse=True)  # Sort descending (newest first)
+        return _manifest(cache_dir.parent).years(user)  # Newest first
     return []
 
 
@@ -98,11 +113,14 @@ def user_selection():
 
             dcc.RadioItems(
                 id="movie-filter",
+                # Runtime cutoffs in minutes; filtered stats are computed on demand from the master list
                 options=[
-                    {"label": "All", "value": "all"},
-                    {"label": "Full Movies Only", "value": "full"},
+                    {"label": "All", "value": 0},
+                    {"label": "40+ min", "value": 40},
+                    {"label": "Full Movies Only", "value": 75},
+                    {"label": "2h+", "value": 120},
                 ],
-                value="all",
+                value=0,
                 labelStyle={
                     "display": "inline-block",
                     "marginRight": "15px",
@@ -0,0 +1,115 @@
+"""The pandas stats backend must produce exactly the stats of StatsCalculator."""
+
+import json
+import random
+import pytest
+
+pytest.importorskip("pandas")
+
+from analysis.metrics import STATS_KEYS
+from analysis.stats_calculator import StatsCalculator
+from analysis.stats_frame import FrameStatsCalculator
+from utils.credits import people_lists
+
+PROFILE = {"display_name": "Test", "avatar": {"exists": False}, "favorites": {}}
+GENRES = ["Drama", "Comedy", "Horror", "Action", "Documentary"]
+COUNTRIES = ["USA", "UK", "France", "Japan"]
+
+
+def film(rng: random.Random, number: int) -> dict:
+    slug = f"film-{number}"
+    return {
+        "slug": slug,
+        "name": f"Film {number}",
+        "released": rng.choice([None, 1999, 2015, 2023, 2024]),
+        # "null" is how the master list stores an unknown runtime
+        "runtime": rng.choice(["null", 22, 40, 74, 75, 96, 120, 181]),
+        "popularity": rng.choice([None, {"members": rng.randint(10, 10 ** 6), "fans": 1, "likes": 2, "reviews": 3, "lists": 4}]),
+        "average rating": rng.choice([None, 2.1, 3.45, 4.02]),
+        "genres": rng.sample(GENRES, rng.randint(0, 2)),
+        "country": rng.sample(COUNTRIES, rng.randint(1, 2)),
+        "language": ["English"] + rng.sample(["French", "Japanese"], rng.randint(0, 1)),
+        "studio": [f"Studio {rng.randint(1, 4)}"],
+        "cast": [[f"actor-{rng.randint(1, 12)}", "Role"] for _ in range(3)],
+        "director": [f"director-{rng.randint(1, 5)}"],
+    }
+
+
+def year_of_watches(year: int, watches: int, seed: int) -> tuple:
+    """(master list, credits) of `watches` watches: rewatches, same-day entries, unrated and "null" runtime films."""
+    rng = random.Random(seed)
+    films = [film(rng, number) for number in range(max(1, watches // 2))]
+
+    master_list, credits = {}, {"people": {}, "films": {}}
+    month, day = 1, 1
+    for movie_num in range(1, watches + 1):
+        # Several watches a day, and some gaps of a few days
+        if rng.random() < 0.5:
+            day += rng.randint(1, 4)
+            if day > 28:
+                month, day = min(12, month + 1), 1
+        watched = rng.choice(films)
+        master_list[str(movie_num)] = {
+            "name": watched["name"],
+            "slug": watched["slug"],
+            "rating": rng.choice([None, 0.5, 2.0, 3.5, 4.0, 5.0]),
+            "rewatched": rng.random() < 0.2,
+            "reviewed": rng.random() < 0.5,
+            "liked": rng.random() < 0.3,
+            "date": {"year": year, "month": month, "day": day},
+            **{key: watched[key] for key in ("released", "runtime", "popularity", "average rating", "genres", "country", "language", "studio")},
+        }
+        credits["films"][watched["slug"]] = {"cast": watched["cast"], "director": watched["director"]}
+        for person_slug in [slug for slug, _ in watched["cast"]] + watched["director"]:
+            credits["people"][person_slug] = person_slug.replace("-", " ").title()
+
+    return master_list, credits
+
+
+def calculator(calculator_class, year: int, master_list: dict, credits: dict):
+    cast_list, director_list = people_lists(master_list, credits)
+    calc = calculator_class({}, master_list, cast_list, director_list, year, "tester", credits=credits)
+    # Profile info is only copied into stats['info']; setting it keeps the test off the network
+    calc.profile = PROFILE
+    return calc
+
+
+def assert_same(expected: dict, actual: dict):
+    assert list(actual) == list(expected)
+    for key in expected:
+        assert json.dumps(actual[key]) == json.dumps(expected[key]), key
+
+
+YEARS = {
+    "empty year": (2025, 0, 0),
+    "single watch": (2025, 1, 1),
+    "leap year": (2024, 60, 2),
+    "busy year": (2023, 400, 3),
+}
+
+
+@pytest.mark.parametrize("case", YEARS)
+def test_stats_match(case):
+    year, watches, seed = YEARS[case]
+    master_list, credits = year_of_watches(year, watches, seed)
+
+    expected = calculator(StatsCalculator, year, master_list, credits).compute()
+    actual = calculator(FrameStatsCalculator, year, master_list, credits).compute()
+
+    assert_same(expected["info"], actual["info"])
+    assert_same(expected["stats"], actual["stats"])
+
+
+@pytest.mark.parametrize("case", YEARS)
+@pytest.mark.parametrize("min_runtime", [1, 40, 75, 120])
+def test_runtime_views_match(case, min_runtime):
+    year, watches, seed = YEARS[case]
+    master_list, credits = year_of_watches(year, watches, seed)
+
+    python_calc = calculator(StatsCalculator, year, master_list, credits)
+    frame_calc = calculator(FrameStatsCalculator, year, master_list, credits)
+    python_calc.compute()
+    frame_calc.compute()
+
+    assert_same(dict(python_calc.view(min_runtime)), dict(frame_calc.view(min_runtime)))
+    assert list(frame_calc.view(min_runtime)) == list(STATS_KEYS)
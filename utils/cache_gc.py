@@ -0,0 +1,200 @@
+"""Cache garbage collection.
+
+Superseded files (the old per-list cast/director files and full stats of years
+rebuilt with credits, temp files left by interrupted writes) are always removed. With a byte budget,
+whole artifact tiers are then evicted, cheapest to rebuild first and least
+recently used year first within a tier:
+
+    derived  stats, old full stats, stats aggregates, year summaries, stage hashes, Parquet partitions (recomputed locally)
+    built    master list, credits, old cast/director files (rebuilt from the diary and film store)
+    fetched  diary, sync marks, failed films (need Letterboxd again)
+    films    film store entries no remaining master list uses
+
+Films still used by a cached master list are never evicted.
+"""
+
+import argparse
+import os
+import re
+import time
+from utils import serialization
+from utils.file_lock import LOCK_FILENAME
+from utils.manifest import CacheManifest, artifact_name
+
+
+# Runtime-filtered stats are computed on demand from the master list and credits now
+SUPERSEDED_ARTIFACTS = {"cast", "full_cast", "director", "full_director", "full_stats"}
+TIERS = (
+    ("derived", {"stats", "full_stats", "aggregates", "summary", "stages"}),
+    ("built", {"master", "credits", "cast", "full_cast", "director", "full_director"}),
+    ("fetched", {"diary", "diary_sync", "failed"}),
+)
+
+# Temp files younger than this may still belong to a running write
+STALE_TMP_SECONDS = 3600
+
+UNITS = {"": 1, "K": 1000, "M": 1000 ** 2, "G": 1000 ** 3}
+SIZE_PATTERN = re.compile(r"^\s*(\d+(?:\.\d*)?|\.\d+)\s*([KMG]?)B?\s*$", re.IGNORECASE)
+
+
+def parse_size(value: str) -> int:
+    """Parse "500MB", "2G", "10k", "1.5 GB" or a plain byte count."""
+    match = SIZE_PATTERN.match(value)
+    if match is None:
+        raise argparse.ArgumentTypeError(f'invalid size "{value}": expected a number of bytes, optionally followed by K, M or G (with or without B), e.g. "500MB" or "2G"')
+    number, unit = match.groups()
+    return int(float(number) * UNITS[unit.upper()])
+
+
+class CacheGC:
+    """Collects garbage in a file backend cache directory."""
+
+    def __init__(self, base_cache_dir="cache", dry_run: bool = False):
+        self.base_cache_dir = base_cache_dir
+        self.dry_run = dry_run
+        self.manifest = CacheManifest(base_cache_dir)
+        self.removed = []
+        self.freed = 0
+
+    # ---------------------------------------------------------
+    # Inventory
+    # ---------------------------------------------------------
+    def _user_files(self):
+        """Yield (user, year, filename, path, size) for every per-user file."""
+        for user in sorted(os.listdir(self.base_cache_dir)):
+            user_dir = os.path.join(self.base_cache_dir, user)
+            if user.startswith("_") or not os.path.isdir(user_dir):
+                continue
+            for year in sorted(os.listdir(user_dir)):
+                year_dir = os.path.join(user_dir, year)
+                if not os.path.isdir(year_dir):
+                    continue
+                for filename in sorted(os.listdir(year_dir)):
+                    path = os.path.join(year_dir, filename)
+                    if os.path.isfile(path):
+                        yield user, year, filename, path, os.path.getsize(path)
+
+    def _dataset_files(self):
+        """Yield (user, year, path, size) for every Parquet partition file."""
+        dataset_dir = os.path.join(self.base_cache_dir, "_dataset")
+        if not os.path.isdir(dataset_dir):
+            return
+        for root, _, files in os.walk(dataset_dir):
+            parts = dict(p.split("=", 1) for p in root.split(os.sep) if "=" in p)
+            for filename in files:
+                path = os.path.join(root, filename)
+                yield parts.get("user"), parts.get("year"), path, os.path.getsize(path)
+
+    def _film_files(self):
+        films_dir = os.path.join(self.base_cache_dir, "_films")
+        if not os.path.isdir(films_dir):
+            return []
+        return [entry for entry in os.scandir(films_dir) if entry.is_file() and entry.name.endswith((".json", ".tmp"))]
+
+    def total_size(self) -> int:
+        total = 0
+        for root, _, files in os.walk(self.base_cache_dir):
+            total += sum(os.path.getsize(os.path.join(root, f)) for f in files)
+        return total
+
+    # ---------------------------------------------------------
+    # Removal
+    # ---------------------------------------------------------
+    def _remove(self, path: str, size: int, user: str | None = None, year=None, filename: str | None = None):
+        self.removed.append(path)
+        self.freed += size
+        if self.dry_run:
+            return
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            return
+        if user is not None and filename is not None:
+            self.manifest.forget(user, year, filename)
+
+    def remove_superseded(self):
+        now = time.time()
+        files = list(self._user_files())
+        # The old cast/director/full stats files are only superseded once the year has been rebuilt with credits
+        with_credits = {(user, year) for user, year, filename, _, _ in files if artifact_name(user, year, filename) == "credits"}
+
+        for user, year, filename, path, size in files:
+            if filename.endswith(".tmp"):
+                if now - os.path.getmtime(path) > STALE_TMP_SECONDS:
+                    self._remove(path, size)
+            elif artifact_name(user, year, filename) in SUPERSEDED_ARTIFACTS and (user, year) in with_credits:
+                self._remove(path, size, user, year, filename)
+
+        for entry in self._film_files():
+            if entry.name.endswith(".tmp") and now - entry.stat().st_mtime > STALE_TMP_SECONDS:
+                self._remove(entry.path, entry.stat().st_size)
+
+    def _used_films(self) -> set:
+        """Slugs of every film a remaining master list uses."""
+        slugs = set()
+        for user, year, filename, path, _ in self._user_files():
+            if artifact_name(user, year, filename) == "master" and path not in self.removed:
+                try:
+                    master = serialization.read_file(path)
+                except Exception:
+                    continue
+                slugs.update(record["slug"] for record in master.values())
+        return slugs
+
+    def evict(self, max_bytes: int):
+        """Evict tiers until the cache fits in `max_bytes`."""
+        remaining = self.total_size() - self.freed
+        if remaining <= max_bytes:
+            return
+
+        for _, artifacts in TIERS:
+            candidates = [
+                (self.manifest.last_used(user, year), path, size, user, year, filename)
+                for user, year, filename, path, size in self._user_files()
+                if artifact_name(user, year, filename) in artifacts and path not in self.removed
+            ]
+            if "stats" in artifacts:
+                candidates += [
+                    (self.manifest.last_used(user, year), path, size, None, None, None)
+                    for user, year, path, size in self._dataset_files()
+                ]
+
+            for _, path, size, user, year, filename in sorted(candidates):
+                self._remove(path, size, user, year, filename)
+                remaining -= size
+                if remaining <= max_bytes:
+                    return
+
+        used = self._used_films()
+        films = sorted(
+            (entry for entry in self._film_files() if entry.name.endswith(".json") and entry.name[:-len(".json")] not in used),
+            key=lambda entry: entry.stat().st_mtime,
+        )
+        for entry in films:
+            size = entry.stat().st_size
+            self._remove(entry.path, size)
+            remaining -= size
+            if remaining <= max_bytes:
+                return
+
+    def _prune_empty_dirs(self):
+        # Bottom up, so a year dir emptied here lets its user dir go too
+        for root, _, _ in os.walk(self.base_cache_dir, topdown=False):
+            if root == self.base_cache_dir:
+                continue
+            entries = os.listdir(root)
+            if entries == [LOCK_FILENAME]:
+                os.remove(os.path.join(root, LOCK_FILENAME))
+                entries = []
+            if not entries:
+                os.rmdir(root)
+
+    def run(self, max_bytes: int | None = None) -> dict:
+        """Remove superseded files, then evict down to `max_bytes` if given."""
+        before = self.total_size()
+        self.remove_superseded()
+        if max_bytes is not None:
+            self.evict(max_bytes)
+        if not self.dry_run:
+            self._prune_empty_dirs()
+        return {"before": before, "after": before - self.freed, "freed": self.freed, "files": len(self.removed)}
@@ -0,0 +1,72 @@
+"""Per-year calendar lookups shared by the daily, weekly and weekday stats.
+
+Weeks follow the stats layout: week 1 runs from Jan 1 to the first Saturday,
+every later week from Sunday to Saturday, and the last one ends on Dec 31.
+"""
+
+import calendar
+from datetime import date, timedelta
+from functools import lru_cache
+
+
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+
+def format_week_label(start: date, end: date) -> str:
+    if start.month == end.month:
+        return f"{start.strftime('%b')} {start.day}–{end.day}"
+    return f"{start.strftime('%b')} {start.day}–{end.strftime('%b')} {end.day}"
+
+
+class CalendarIndex:
+    """Day, week, weekday and month of every date in `year`, looked up by (month, day)."""
+
+    def __init__(self, year: int):
+        self.year = year
+        start = date(year, 1, 1)
+        self.days = 366 if calendar.isleap(year) else 365
+
+        # Day-of-year offset of each month's 1st
+        self.month_offsets = [0]
+        for month in range(1, 12):
+            self.month_offsets.append(self.month_offsets[-1] + calendar.monthrange(year, month)[1])
+
+        first_week_end = (5 - start.weekday()) % 7
+        self.day_week = [1 if offset <= first_week_end else 2 + (offset - first_week_end - 1) // 7 for offset in range(self.days)]
+        self.day_weekday = [(start.weekday() + offset) % 7 for offset in range(self.days)]
+
+        self.day_labels = [f"day {offset + 1}" for offset in range(self.days)]
+        self.week_labels = [f"week {week}" for week in range(1, self.day_week[-1] + 1)]
+
+        # The "Jan 5–11" range of every week, from its first to its last day
+        self.week_ranges = []
+        for week in range(1, len(self.week_labels) + 1):
+            first = self.day_week.index(week)
+            last = first + self.day_week.count(week) - 1
+            self.week_ranges.append(format_week_label(start + timedelta(days=first), start + timedelta(days=last)))
+
+        # Everything a watch is bucketed by, per day of the year
+        self._entries = [
+            (self.day_labels[offset], self.week_labels[self.day_week[offset] - 1], WEEKDAYS[self.day_weekday[offset]])
+            for offset in range(self.days)
+        ]
+
+    def offset(self, month: int, day: int) -> int:
+        """0-based day of the year."""
+        return self.month_offsets[month - 1] + day - 1
+
+    def lookup(self, year: int, month: int, day: int):
+        """("day N", "week N", weekday name) for a date, or None if it is not in this year."""
+        if year != self.year:
+            return None
+        return self._entries[self.offset(month, day)]
+
+    def weeks(self) -> list:
+        """[{"week N": "Jan 1–4"}, ...], the "weeks list" stored with the stats."""
+        return [{label: week_range} for label, week_range in zip(self.week_labels, self.week_ranges)]
+
+
+@lru_cache(maxsize=None)
+def calendar_index(year: int) -> CalendarIndex:
+    """The shared index for `year`, built on first use."""
+    return CalendarIndex(year)
@@ -0,0 +1,152 @@
+"""Columnar (Parquet) export of the cached master lists and credits.
+
+Three tables are written under `cache/_dataset/`, hive-partitioned by user and
+year so any Arrow/Parquet engine (pyarrow.dataset, DuckDB, Polars, pandas) can
+query every cached user at once:
+
+    _dataset/watches/user=<user>/year=<year>/data.parquet   one row per diary watch
+    _dataset/films/user=<user>/year=<year>/data.parquet     one row per film watched that year
+    _dataset/credits/user=<user>/year=<year>/data.parquet   one row per film-person credit
+
+pyarrow is optional; without it nothing is written.
+"""
+
+import os
+from datetime import date
+from utils.file_lock import atomic_write
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+
+POPULARITY_KEYS = ("members", "fans", "likes", "reviews", "lists")
+
+
+def _schemas():
+    string_list = pa.list_(pa.string())
+    return {
+        "watches": pa.schema([
+            ("position", pa.int32()),
+            ("slug", pa.string()),
+            ("name", pa.string()),
+            ("date", pa.date32()),
+            ("rating", pa.float32()),
+            ("rewatched", pa.bool_()),
+            ("reviewed", pa.bool_()),
+            ("liked", pa.bool_()),
+        ]),
+        "films": pa.schema(
+            [
+                ("slug", pa.string()),
+                ("name", pa.string()),
+                ("released", pa.int32()),
+                ("runtime", pa.int32()),
+                ("average_rating", pa.float32()),
+                ("genres", string_list),
+                ("country", string_list),
+                ("language", string_list),
+                ("studio", string_list),
+            ]
+            + [(key, pa.int64()) for key in POPULARITY_KEYS]
+        ),
+        "credits": pa.schema([
+            ("film_slug", pa.string()),
+            ("kind", pa.string()),
+            ("position", pa.int32()),
+            ("person_slug", pa.string()),
+            ("person_name", pa.string()),
+            ("role", pa.string()),
+        ]),
+    }
+
+
+def _int_or_none(value):
+    # Runtimes and years come through as ints, None or the string 'null'
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _rows(master_list: dict, credits: dict | None) -> dict:
+    watches = []
+    films = {}
+    for position, record in master_list.items():
+        d = record.get("date") or {}
+        watches.append({
+            "position": int(position),
+            "slug": record["slug"],
+            "name": record.get("name"),
+            "date": date(d["year"], d["month"], d["day"]) if d else None,
+            "rating": record.get("rating"),
+            "rewatched": record.get("rewatched"),
+            "reviewed": record.get("reviewed"),
+            "liked": record.get("liked"),
+        })
+
+        if record["slug"] not in films:
+            popularity = record.get("popularity") or {}
+            films[record["slug"]] = {
+                "slug": record["slug"],
+                "name": record.get("name"),
+                "released": _int_or_none(record.get("released")),
+                "runtime": _int_or_none(record.get("runtime")),
+                "average_rating": record.get("average rating"),
+                "genres": record.get("genres") or [],
+                "country": record.get("country") or [],
+                "language": record.get("language") or [],
+                "studio": record.get("studio") or [],
+                **{key: popularity.get(key) for key in POPULARITY_KEYS},
+            }
+
+    credit_rows = []
+    if credits:
+        people = credits.get("people", {})
+        for film_slug, film in credits.get("films", {}).items():
+            for position, (person_slug, role) in enumerate(film["cast"]):
+                credit_rows.append({"film_slug": film_slug, "kind": "cast", "position": position, "person_slug": person_slug, "person_name": people.get(person_slug), "role": role})
+            for position, person_slug in enumerate(film["director"]):
+                credit_rows.append({"film_slug": film_slug, "kind": "director", "position": position, "person_slug": person_slug, "person_name": people.get(person_slug), "role": None})
+
+    return {"watches": watches, "films": list(films.values()), "credits": credit_rows}
+
+
+def export_year(user: str, year: int, master_list: dict, credits: dict | None = None, base_cache_dir: str = "cache") -> list | None:
+    """Write the user's year into the Parquet dataset, replacing its partitions.
+
+    Returns the written paths, or None when pyarrow is not installed. Without
+    `credits` the credits partition is left untouched.
+    """
+    if pa is None:
+        return None
+
+    schemas = _schemas()
+    paths = []
+    for table_name, rows in _rows(master_list, credits).items():
+        if table_name == "credits" and credits is None:
+            continue
+
+        partition = os.path.join(base_cache_dir, "_dataset", table_name, f"user={user}", f"year={year}")
+        os.makedirs(partition, exist_ok=True)
+        path = os.path.join(partition, "data.parquet")
+
+        table = pa.Table.from_pylist(rows, schema=schemas[table_name])
+        sink = pa.BufferOutputStream()
+        pq.write_table(table, sink, compression="zstd")
+        atomic_write(path, sink.getvalue().to_pybytes())
+        paths.append(path)
+
+    return paths
+
+
+def open_dataset(table_name: str, base_cache_dir: str = "cache"):
+    """Return a pyarrow dataset over one table for every cached user and year."""
+    if pa is None:
+        raise ImportError("Reading the Parquet dataset needs the 'pyarrow' package")
+
+    import pyarrow.dataset as ds
+    return ds.dataset(os.path.join(base_cache_dir, "_dataset", table_name), format="parquet", partitioning="hive")
@@ -0,0 +1,107 @@
+"""Normalized film credits for a user's year.
+
+The credits file stores every film's cast and directors once, keyed by film
+slug, with person names in a separate table:
+
+    {"people": {person_slug: name},
+     "films": {film_slug: {"cast": [[person_slug, role], ...], "director": [person_slug, ...]}}}
+
+The cast and director lists (and their runtime-filtered "full" variants) are
+derived from it and the master list when loaded, instead of being stored.
+"""
+
+
+def build_credits(films: list) -> dict:
+    """Collect the credits of `films` (film store records, in watch order)."""
+    credits = {"people": {}, "films": {}}
+
+    for film in films:
+        if film["slug"] in credits["films"]:
+            continue
+
+        cast = []
+        for member in film.get("cast") or []:
+            if not member.get("slug") or not member.get("name"):
+                continue
+            credits["people"].setdefault(member["slug"], member["name"])
+            cast.append([member["slug"], member.get("role_name")])
+
+        directors = (film.get("crew") or {}).get("director", [])
+        if isinstance(directors, dict):
+            directors = [directors]
+
+        director = []
+        for person in directors:
+            if not person.get("slug") or not person.get("name"):
+                continue
+            credits["people"].setdefault(person["slug"], person["name"])
+            director.append(person["slug"])
+
+        credits["films"][film["slug"]] = {"cast": cast, "director": director}
+
+    return credits
+
+
+def credits_from_people_lists(cast_list: dict, director_list: dict) -> dict:
+    """Rebuild the credits of a year cached before credits, from its stored cast and director lists.
+
+    The lists repeat a film once per watch; every film keeps each person once.
+    """
+    credits = {"people": {}, "films": {}}
+
+    def film(slug):
+        return credits["films"].setdefault(slug, {"cast": [], "director": []})
+
+    for person_slug, person in (cast_list or {}).items():
+        credits["people"].setdefault(person_slug, person.get("name"))
+        seen = set()
+        for film_slug, role in person.get("roles", []):
+            if film_slug not in seen:
+                seen.add(film_slug)
+                film(film_slug)["cast"].append([person_slug, role])
+
+    for person_slug, person in (director_list or {}).items():
+        credits["people"].setdefault(person_slug, person.get("name"))
+        for film_slug in dict.fromkeys(person.get("movies", [])):
+            film(film_slug)["director"].append(person_slug)
+
+    return credits
+
+
+def _is_full_length(runtime, min_runtime: int) -> bool:
+    return runtime != 'null' and bool(runtime) and int(runtime) >= min_runtime
+
+
+def people_lists(master_list: dict, credits: dict, min_runtime: int | None = None) -> tuple:
+    """Derive (cast_list, director_list) for the watches in `master_list`.
+
+    Every watch counts as an appearance, rewatches included. With `min_runtime`
+    only films at least that long count. Both lists are sorted by appearances.
+    """
+    people = credits.get("people", {})
+    films = credits.get("films", {})
+    cast_list = {}
+    director_list = {}
+
+    for record in master_list.values():
+        film = films.get(record["slug"])
+        if film is None:
+            continue
+        if min_runtime is not None and not _is_full_length(record.get("runtime"), min_runtime):
+            continue
+
+        for person_slug, role in film["cast"]:
+            if person_slug not in cast_list:
+                cast_list[person_slug] = {"name": people.get(person_slug), "slug": person_slug, "appearances": 0, "roles": []}
+            cast_list[person_slug]["appearances"] += 1
+            cast_list[person_slug]["roles"].append((record["slug"], role))
+
+        for person_slug in film["director"]:
+            if person_slug not in director_list:
+                director_list[person_slug] = {"name": people.get(person_slug), "slug": person_slug, "appearances": 0, "movies": []}
+            director_list[person_slug]["appearances"] += 1
+            director_list[person_slug]["movies"].append(record["slug"])
+
+    cast_list = dict(sorted(cast_list.items(), key=lambda x: x[1]["appearances"], reverse=True))
+    director_list = dict(sorted(director_list.items(), key=lambda x: x[1]["appearances"], reverse=True))
+    return cast_list, director_list
@@ -1,6 +1,6 @@
-import json
 from pathlib import Path
 from typing import Any
+from utils import serialization
 
 
 class DataAccess:
@@ -24,8 +24,7 @@ class DataAccess:
 
     def save_json(self, user: str, year: int, filename: str, data: Any) -> str:
         path = self._make_cache_path(user, year, filename)
-        with open(path, "w", encoding="utf-8") as fh:
-            json.dump(data, fh, ensure_ascii=False, indent=2)
+        serialization.write_file(path, data)
         return str(path)
 
     def load_json(self, user: str, year: int, filename: str) -> Any:
@@ -33,18 +32,20 @@ class DataAccess:
         if not path.exists():
             return None
         try:
-            with open(path, "r", encoding="utf-8") as fh:
-                return json.load(fh)
+            return serialization.read_file(path)
         except Exception:
             return None
 import os
-import json
+from utils.manifest import CacheManifest
 
 class DataAccess:
     """Handles caching, file I/O, and directory management."""
 
-    def __init__(self, base_cache_dir="cache"):
+    def __init__(self, base_cache_dir="cache", cache_format=None):
         self.base_cache_dir = base_cache_dir
+        # e.g. "json", "msgpack+zstd"; None uses LETTERBOXD_CACHE_FORMAT (compact JSON by default)
+        self.cache_format = cache_format
+        self.manifest = CacheManifest(base_cache_dir)
         os.makedirs(self.base_cache_dir, exist_ok=True)
 
     def _get_cache_path(self, user: str, year: int, filename: str) -> str:
@@ -54,13 +55,19 @@ class DataAccess:
 
     def save_json(self, user: str, year: int, filename: str, data: dict) -> str:
         path = self._get_cache_path(user, year, filename)
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(data, f)
+        raw = serialization.write_file(path, data, self.cache_format)
+        self.manifest.record(user, year, filename, raw)
         return path
 
     def load_json(self, user: str, year: int, filename: str):
         path = self._get_cache_path(user, year, filename)
         if not os.path.exists(path):
             return None
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
\ No newline at end of file
+        return serialization.read_file(path)
+
+def get_data_access(base_cache_dir="cache"):
+    """Return the cache backend selected by LETTERBOXD_CACHE_BACKEND ("json" or "sqlite")."""
+    if os.getenv("LETTERBOXD_CACHE_BACKEND", "json") == "sqlite":
+        from utils.sqlite_store import SQLiteDataAccess
+        return SQLiteDataAccess(base_cache_dir)
+    return DataAccess(base_cache_dir)
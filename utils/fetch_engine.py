@@ -0,0 +1,210 @@
+import asyncio
+import heapq
+import itertools
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Lower number = served first when requests are waiting for a slot
+STAGE_PRIORITY = {
+    "diary": 0,
+    "movie": 1,
+    "watchers": 2,
+}
+
+
+class TokenBucket:
+    """Requests-per-second limiter. Only used from the engine's event loop."""
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    async def acquire(self, tokens: float = 1):
+        tokens = min(tokens, self.capacity)
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return
+
+            await asyncio.sleep((tokens - self.tokens) / self.rate)
+
+
+class SharedBudget:
+    """Request budget shared by every process of a batch run.
+
+    Caps the requests in flight across all processes and paces them with one
+    token bucket kept in shared memory. Pass it to worker processes through the
+    pool initializer and hand it to `configure_engine`.
+    """
+
+    def __init__(self, max_in_flight: int = 8, requests_per_second: float = 8.0):
+        self.rate = requests_per_second
+        self.capacity = max(1.0, requests_per_second)
+        self.slots = multiprocessing.BoundedSemaphore(max_in_flight)
+        self.lock = multiprocessing.Lock()
+        self.tokens = multiprocessing.Value("d", self.capacity, lock=False)
+        self.updated = multiprocessing.Value("d", time.time(), lock=False)
+
+    def acquire(self, cost: float = 1):
+        """Block until a slot and `cost` tokens are available."""
+        cost = min(cost, self.capacity)
+        self.slots.acquire()
+        while True:
+            with self.lock:
+                now = time.time()
+                self.tokens.value = min(self.capacity, self.tokens.value + (now - self.updated.value) * self.rate)
+                self.updated.value = now
+
+                if self.tokens.value >= cost:
+                    self.tokens.value -= cost
+                    return
+
+                wait = (cost - self.tokens.value) / self.rate
+            time.sleep(wait)
+
+    def release(self):
+        self.slots.release()
+
+
+class _PrioritySlots:
+    """Semaphore that hands freed slots to the highest-priority waiter."""
+
+    def __init__(self, size: int):
+        self.free = size
+        self.waiters = []
+        self.counter = itertools.count()
+
+    async def acquire(self, priority: int):
+        if self.free > 0 and not self.waiters:
+            self.free -= 1
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self.waiters, (priority, next(self.counter), waiter))
+        await waiter
+
+    def release(self):
+        while self.waiters:
+            _, _, waiter = heapq.heappop(self.waiters)
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.free += 1
+
+
+class FetchEngine:
+    """Single fetch engine shared by every pipeline stage.
+
+    Blocking letterboxdpy calls are scheduled on a background asyncio loop that
+    caps the number of requests in flight, spaces them with a token bucket and
+    serves waiting stages by priority. `submit` returns a regular
+    `concurrent.futures.Future`, so callers can keep using `as_completed`.
+    An optional `SharedBudget` adds a limit shared with other processes.
+    """
+
+    def __init__(self, max_in_flight: int = 8, requests_per_second: float = 8.0, budget: SharedBudget | None = None):
+        self.max_in_flight = max_in_flight
+        self.requests_per_second = requests_per_second
+        self.budget = budget
+
+        self._lock = threading.Lock()
+        self._loop = None
+        self._thread = None
+        self._executor = None
+        self._slots = None
+        self._bucket = None
+
+    def _ensure_loop(self):
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._executor = ThreadPoolExecutor(max_workers=self.max_in_flight)
+                self._slots = _PrioritySlots(self.max_in_flight)
+                self._bucket = TokenBucket(self.requests_per_second)
+                self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+                self._thread.start()
+        return self._loop
+
+    def _call_with_budget(self, fn, args, cost: float):
+        self.budget.acquire(cost)
+        try:
+            return fn(*args)
+        finally:
+            self.budget.release()
+
+    async def _attempt(self, fn, args, priority: int, cost: float):
+        await self._slots.acquire(priority)
+        try:
+            await self._bucket.acquire(cost)
+            if self.budget is not None:
+                return await self._loop.run_in_executor(self._executor, self._call_with_budget, fn, args, cost)
+            return await self._loop.run_in_executor(self._executor, fn, *args)
+        finally:
+            self._slots.release()
+
+    async def _run(self, fn, args, priority: int, cost: float, attempts: int, retry_delay: float, on_error):
+        for attempt in range(1, attempts + 1):
+            try:
+                return await self._attempt(fn, args, priority, cost)
+            except Exception as e:
+                if on_error is not None:
+                    on_error(attempt, e)
+                if attempt == attempts:
+                    raise
+            # The backoff holds no slot, and the retry waits for tokens like any other request
+            await asyncio.sleep(retry_delay * 2 ** (attempt - 1))
+
+    def submit(self, fn, *args, stage: str = "movie", cost: float = 1, attempts: int = 1, retry_delay: float = 1.0, on_error=None):
+        """Schedule `fn(*args)`; `cost` is the number of page requests it makes.
+
+        A call that raises is retried up to `attempts` times in all, after a delay
+        starting at `retry_delay` seconds and doubling each time. `on_error(attempt, error)`
+        is called for every failed attempt; the last error is raised by the future.
+        """
+        loop = self._ensure_loop()
+        priority = STAGE_PRIORITY.get(stage, len(STAGE_PRIORITY))
+        return asyncio.run_coroutine_threadsafe(self._run(fn, args, priority, cost, attempts, retry_delay, on_error), loop)
+
+    def close(self):
+        with self._lock:
+            if self._loop is None:
+                return
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._executor.shutdown(wait=False)
+            self._loop.close()
+            self._loop = None
+
+
+_engine = None
+
+
+def get_engine() -> FetchEngine:
+    """Return the process-wide engine, creating it with defaults if needed."""
+    global _engine
+    if _engine is None:
+        _engine = FetchEngine()
+    return _engine
+
+
+def configure_engine(max_in_flight: int | None = None, requests_per_second: float | None = None, budget: SharedBudget | None = None) -> FetchEngine:
+    """Replace the process-wide engine with one using the given limits."""
+    global _engine
+    current = _engine or FetchEngine()
+    if _engine is not None:
+        _engine.close()
+    _engine = FetchEngine(
+        max_in_flight=max_in_flight or current.max_in_flight,
+        requests_per_second=requests_per_second or current.requests_per_second,
+        budget=budget or current.budget,
+    )
+    return _engine
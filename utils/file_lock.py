@@ -0,0 +1,65 @@
+"""Atomic, lock-protected cache file writes.
+
+Writers take an exclusive advisory lock on a `.cache.lock` file in the target
+directory, write to a temp file next to the target and `os.replace` it, so a
+reader (e.g. a dashboard worker) sees either the old file or the new one, never
+a truncated one. Readers take the same lock shared. Locks are advisory and only
+used where `fcntl` exists; the rename alone is already atomic on every platform.
+"""
+
+import os
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+LOCK_FILENAME = ".cache.lock"
+
+
+@contextmanager
+def locked(path, shared: bool = False):
+    """Hold the advisory lock of the directory containing `path`."""
+    if fcntl is None:
+        yield
+        return
+
+    lock_path = os.path.join(os.path.dirname(os.path.abspath(path)), LOCK_FILENAME)
+    try:
+        fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+    except OSError:
+        # Read-only cache directory: nobody can be writing through us, the rename keeps reads safe
+        yield
+        return
+
+    try:
+        fcntl.flock(fd, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        yield
+    finally:
+        os.close(fd)
+
+
+def replace_file(path, data: bytes) -> None:
+    """Replace `path` with `data` in one step, for callers already holding the lock."""
+    path = os.fspath(path)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def atomic_write(path, data: bytes) -> None:
+    """Replace `path` with `data` in one step."""
+    with locked(path):
+        replace_file(path, data)
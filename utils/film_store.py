@@ -0,0 +1,44 @@
+import os
+from utils import serialization
+
+
+class FilmStore:
+    """Shared per-slug cache of film metadata.
+
+    Each film is stored once under `cache/_films/<slug>.json`, no matter how many
+    users or years logged it, so a refresh only fetches films nobody has seen yet.
+    """
+
+    def __init__(self, base_cache_dir="cache"):
+        self.films_dir = os.path.join(base_cache_dir, "_films")
+        os.makedirs(self.films_dir, exist_ok=True)
+        self._films = {}
+
+    def _get_film_path(self, slug: str) -> str:
+        return os.path.join(self.films_dir, f"{slug}.json")
+
+    def get(self, slug: str):
+        """Return the stored film for `slug`, or None if it was never fetched."""
+        if slug in self._films:
+            return self._films[slug]
+
+        path = self._get_film_path(slug)
+        if not os.path.exists(path):
+            return None
+        try:
+            film = serialization.read_file(path)
+        except Exception:
+            return None
+
+        self._films[slug] = film
+        return film
+
+    def put(self, slug: str, film: dict) -> str:
+        # write_file renames a temp file into place, so other processes never read a partial film
+        path = self._get_film_path(slug)
+        serialization.write_file(path, film)
+        self._films[slug] = film
+        return path
+
+    def __contains__(self, slug: str) -> bool:
+        return self.get(slug) is not None
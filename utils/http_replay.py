@@ -0,0 +1,167 @@
+import os
+import json
+import time
+import random
+import hashlib
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+from letterboxdpy.core.scraper import Scraper
+
+
+class FixtureStore:
+    """Recorded Letterboxd pages stored under `fixtures/letterboxd/` by default.
+
+    Each page is saved as its own file named by the hash of its path, and
+    `index.json` maps the path to the file, status code and content type.
+    """
+
+    def __init__(self, root="fixtures/letterboxd"):
+        self.root = root
+        os.makedirs(self.root, exist_ok=True)
+        self.index_path = os.path.join(self.root, "index.json")
+        self._lock = threading.Lock()
+
+        if os.path.exists(self.index_path):
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                self.index = json.load(f)
+        else:
+            self.index = {}
+
+    @staticmethod
+    def key(url: str) -> str:
+        parts = urlsplit(url)
+        return parts.path + (f"?{parts.query}" if parts.query else "")
+
+    def save(self, url: str, status: int, body: bytes, content_type: str = "text/html"):
+        key = self.key(url)
+        filename = hashlib.sha1(key.encode("utf-8")).hexdigest() + ".html"
+        with open(os.path.join(self.root, filename), "wb") as f:
+            f.write(body)
+
+        with self._lock:
+            self.index[key] = {"file": filename, "status": status, "content_type": content_type}
+            with open(self.index_path, "w", encoding="utf-8") as f:
+                json.dump(self.index, f, indent=2)
+
+    def load(self, key: str):
+        """Return (status, content_type, body) for a recorded path, or None."""
+        entry = self.index.get(key)
+        if entry is None:
+            return None
+        with open(os.path.join(self.root, entry["file"]), "rb") as f:
+            return entry["status"], entry["content_type"], f.read()
+
+
+@contextmanager
+def _patched_fetch(wrapper):
+    # Every letterboxdpy page load goes through Scraper._fetch, whatever HTTP client it uses
+    original = Scraper.__dict__["_fetch"]
+    fetch = original.__get__(None, Scraper)
+
+    def _fetch(cls, url):
+        return wrapper(fetch, url)
+
+    Scraper._fetch = classmethod(_fetch)
+    try:
+        yield
+    finally:
+        Scraper._fetch = original
+
+
+@contextmanager
+def record(store: FixtureStore):
+    """Save every Letterboxd page letterboxdpy downloads while the block runs."""
+
+    def wrapper(fetch, url):
+        response = fetch(url)
+        store.save(url, response.status_code, response.content, response.headers.get("Content-Type", "text/html"))
+        return response
+
+    with _patched_fetch(wrapper):
+        yield store
+
+
+@contextmanager
+def replay(server: "StandInServer"):
+    """Send letterboxdpy's page loads to a local stand-in server instead of letterboxd.com."""
+
+    def wrapper(fetch, url):
+        return fetch(server.url + FixtureStore.key(url))
+
+    with _patched_fetch(wrapper):
+        yield server
+
+
+class StandInServer:
+    """Local HTTP server that serves recorded pages back.
+
+    `latency` (+ up to `jitter`) seconds are added to every response, and a
+    share `error_rate` of requests is answered with `error_status` so retry
+    and throttling behaviour can be measured deterministically (see `seed`).
+    """
+
+    def __init__(self, store: FixtureStore, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0, error_status: int = 503, seed: int | None = None, port: int = 0):
+        self.store = store
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.random = random.Random(seed)
+        self.requests_served = 0
+        self.errors_served = 0
+        self._lock = threading.Lock()
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), self._make_handler())
+        self.httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self._thread = None
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with server._lock:
+                    server.requests_served += 1
+                    delay = server.latency + server.random.uniform(0, server.jitter)
+                    fail = server.random.random() < server.error_rate
+                    if fail:
+                        server.errors_served += 1
+                time.sleep(delay)
+
+                page = None if fail else server.store.load(self.path)
+                if fail:
+                    status, content_type, body = server.error_status, "text/plain", b"injected error"
+                elif page is None:
+                    status, content_type, body = 404, "text/plain", b"not recorded"
+                else:
+                    status, content_type, body = page
+
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
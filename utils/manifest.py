@@ -0,0 +1,248 @@
+"""Index of every per-user cache file.
+
+`cache/_manifest.json` lists, per user and year, each artifact's file name,
+size, schema version, content hash and write time, plus when the dashboard
+last read each year (the cache GC evicts least recently used years first).
+DataAccess updates it on every save (once per pipeline run inside
+`batched_records`), so the dashboard can list users and years and find the
+newest stats or diary without walking the cache tree. A cache written before
+the manifest existed is indexed by its first pipeline write or by
+migrate_cache.py; until then readers get an unhashed listing and never write.
+"""
+
+import os
+import hashlib
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from utils import serialization
+from utils.file_lock import locked, replace_file
+
+
+MANIFEST_FILENAME = "_manifest.json"
+MANIFEST_VERSION = 1
+
+# Bump an artifact's version when the structure of its file changes
+SCHEMA_VERSIONS = {
+    "diary": 1,
+    "diary_sync": 1,
+    "master": 1,
+    "credits": 1,
+    "failed": 1,
+    "stats": 3,
+    "full_stats": 3,
+    "stages": 1,
+    "aggregates": 1,
+    "summary": 1,
+}
+
+
+def artifact_name(user: str, year, filename: str) -> str:
+    """Map a cache filename to its artifact ("diary", "master", "stats", ...)."""
+    name = filename[:-len(".json")] if filename.endswith(".json") else filename
+    if name == f"diary_data_{user}_{year}":
+        return "diary"
+    if name == f"diary_sync_{user}_{year}":
+        return "diary_sync"
+    prefix = f"{user}_{year}_"
+    return name[len(prefix):] if name.startswith(prefix) else name
+
+
+def _entry(user: str, year, filename: str, raw: bytes, updated_at: str) -> dict:
+    artifact = artifact_name(user, year, filename)
+    return {
+        "artifact": artifact,
+        "size": len(raw),
+        "schema": SCHEMA_VERSIONS.get(artifact, 1),
+        "sha256": hashlib.sha256(raw).hexdigest(),
+        "updated_at": updated_at,
+    }
+
+
+# Entries recorded inside batched_records(), by cache dir, written once when it ends
+_batch = None
+_batch_lock = threading.Lock()
+
+
+@contextmanager
+def batched_records():
+    """Hold every manifest update of the block and write each manifest once at its end."""
+    global _batch
+    with _batch_lock:
+        outer = _batch is None
+        if outer:
+            _batch = {}
+    try:
+        yield
+    finally:
+        if outer:
+            with _batch_lock:
+                pending, _batch = _batch, None
+            for base_cache_dir, entries in pending.items():
+                CacheManifest(base_cache_dir)._record_entries(entries)
+
+
+class CacheManifest:
+    """Reads and updates `<base_cache_dir>/_manifest.json`."""
+
+    def __init__(self, base_cache_dir="cache"):
+        self.base_cache_dir = base_cache_dir
+        self.path = os.path.join(base_cache_dir, MANIFEST_FILENAME)
+        self._data = None
+        self._mtime = None
+
+    def _empty(self) -> dict:
+        return {"version": MANIFEST_VERSION, "users": {}}
+
+    def _read(self) -> dict:
+        try:
+            with open(self.path, "rb") as f:
+                return serialization.loads(f.read())
+        except (OSError, ValueError):
+            return None
+
+    def load(self) -> dict:
+        """Return the manifest, re-reading it only when the file changed.
+
+        Without a (current) manifest file this is a listing of the cache without
+        hashes; reading never scans file contents or writes the manifest.
+        """
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+
+        if self._data is None or mtime != self._mtime:
+            data = self._read() if mtime is not None else None
+            if data is None or data.get("version") != MANIFEST_VERSION:
+                data = self._scan(hashed=False)
+            self._data, self._mtime = data, mtime
+        return self._data
+
+    def _write(self, data: dict):
+        replace_file(self.path, serialization.dumps(data, "json"))
+        self._data, self._mtime = data, os.stat(self.path).st_mtime_ns
+
+    def record(self, user: str, year, filename: str, raw: bytes):
+        """Add or update one file, given the bytes just written for it."""
+        updated_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        entries = {(user, str(year), filename): _entry(user, year, filename, raw, updated_at)}
+
+        with _batch_lock:
+            if _batch is not None:
+                _batch.setdefault(self.base_cache_dir, {}).update(entries)
+                return
+        self._record_entries(entries)
+
+    def _record_entries(self, entries: dict):
+        os.makedirs(self.base_cache_dir, exist_ok=True)
+
+        # Read-modify-write under the cache root lock so concurrent writers don't drop entries
+        with locked(self.path):
+            data = self._read() if os.path.exists(self.path) else None
+            if data is None or data.get("version") != MANIFEST_VERSION:
+                data = self._scan()
+            for (user, year, filename), entry in entries.items():
+                data["users"].setdefault(user, {}).setdefault(year, {})[filename] = entry
+            self._write(data)
+
+    def _scan(self, hashed: bool = True) -> dict:
+        data = self._empty()
+        if not os.path.isdir(self.base_cache_dir):
+            return data
+
+        for user in sorted(os.listdir(self.base_cache_dir)):
+            user_dir = os.path.join(self.base_cache_dir, user)
+            if user.startswith("_") or not os.path.isdir(user_dir):
+                continue
+            for year in sorted(os.listdir(user_dir)):
+                year_dir = os.path.join(user_dir, year)
+                if not os.path.isdir(year_dir):
+                    continue
+                for filename in sorted(os.listdir(year_dir)):
+                    if not filename.endswith(".json"):
+                        continue
+                    path = os.path.join(year_dir, filename)
+                    stat = os.stat(path)
+                    updated_at = datetime.fromtimestamp(stat.st_mtime, timezone.utc).isoformat(timespec="seconds")
+                    if hashed:
+                        with open(path, "rb") as f:
+                            entry = _entry(user, year, filename, f.read(), updated_at)
+                    else:
+                        artifact = artifact_name(user, year, filename)
+                        entry = {"artifact": artifact, "size": stat.st_size, "schema": SCHEMA_VERSIONS.get(artifact, 1), "sha256": None, "updated_at": updated_at}
+                    data["users"].setdefault(user, {}).setdefault(year, {})[filename] = entry
+        return data
+
+    def rebuild(self) -> dict:
+        """Index the cache from disk and save the manifest."""
+        os.makedirs(self.base_cache_dir, exist_ok=True)
+        with locked(self.path):
+            previous = self._read() or {}
+            data = self._scan()
+            data["accessed"] = previous.get("accessed", {})
+            self._write(data)
+        return data
+
+    def forget(self, user: str, year, filename: str):
+        """Drop a deleted file from the manifest."""
+        with locked(self.path):
+            data = self._read()
+            if data is None:
+                return
+            years = data["users"].get(user, {})
+            years.get(str(year), {}).pop(filename, None)
+            if not years.get(str(year)):
+                years.pop(str(year), None)
+                data.get("accessed", {}).get(user, {}).pop(str(year), None)
+            if not years:
+                data["users"].pop(user, None)
+                data.get("accessed", {}).pop(user, None)
+            self._write(data)
+
+    def touch(self, user: str, year, every_seconds: int = 600):
+        """Note that the dashboard just read `user`'s `year` (written at most every `every_seconds`)."""
+        last = self.load().get("accessed", {}).get(user, {}).get(str(year))
+        now = datetime.now(timezone.utc)
+        if last and (now - datetime.fromisoformat(last)).total_seconds() < every_seconds:
+            return
+
+        with locked(self.path):
+            # Until the pipeline writes a manifest there is nowhere to note the access
+            data = self._read()
+            if data is None or data.get("version") != MANIFEST_VERSION:
+                return
+            data.setdefault("accessed", {}).setdefault(user, {})[str(year)] = now.isoformat(timespec="seconds")
+            self._write(data)
+
+    def last_used(self, user: str, year) -> str:
+        """Last dashboard access of a user's year, or its newest write if never viewed."""
+        data = self.load()
+        accessed = data.get("accessed", {}).get(user, {}).get(str(year))
+        written = max((entry["updated_at"] for entry in data["users"].get(user, {}).get(str(year), {}).values()), default="")
+        return max(accessed or "", written)
+
+    # ---------------------------------------------------------
+    # Lookups
+    # ---------------------------------------------------------
+    def users(self) -> list:
+        return sorted(self.load()["users"])
+
+    def years(self, user: str) -> list:
+        """Years cached for `user`, newest first."""
+        return sorted(self.load()["users"].get(user, {}), reverse=True)
+
+    def entry(self, user: str, year, filename: str) -> dict | None:
+        return self.load()["users"].get(user, {}).get(str(year), {}).get(filename)
+
+    def latest(self, artifact: str, user: str | None = None) -> str | None:
+        """Path of the most recently written `artifact` file, optionally for one user."""
+        best = None
+        for name, years in self.load()["users"].items():
+            if user is not None and name != user:
+                continue
+            for year, files in years.items():
+                for filename, entry in files.items():
+                    if entry["artifact"] == artifact and (best is None or entry["updated_at"] > best[0]):
+                        best = (entry["updated_at"], os.path.join(self.base_cache_dir, name, year, filename))
+        return best[1] if best else None
@@ -0,0 +1,79 @@
+import os
+from datetime import datetime, timedelta
+from letterboxdpy.user import User
+from utils import serialization
+
+
+def is_offline() -> bool:
+    """True when LETTERBOXD_OFFLINE is set: everything comes from the cache, nothing from Letterboxd."""
+    return os.getenv("LETTERBOXD_OFFLINE", "") not in ("", "0")
+
+
+class ProfileStore:
+    """Per-user cache of the profile info shown in the stats (display name, avatar, favorites).
+
+    Each profile is stored under `cache/_profiles/<user>.json` and refreshed once
+    it is older than `ttl_days`. A User session that is already open (e.g. the
+    one DiaryFetcher scraped the profile with) refreshes it for free.
+    """
+
+    ttl_days = 7
+
+    def __init__(self, base_cache_dir="cache"):
+        self.profiles_dir = os.path.join(base_cache_dir, "_profiles")
+        os.makedirs(self.profiles_dir, exist_ok=True)
+        self._profiles = {}
+
+    def _get_profile_path(self, user: str) -> str:
+        return os.path.join(self.profiles_dir, f"{user}.json")
+
+    def _load(self, user: str):
+        if user in self._profiles:
+            return self._profiles[user]
+
+        path = self._get_profile_path(user)
+        if not os.path.exists(path):
+            return None
+        try:
+            profile = serialization.read_file(path)
+        except Exception:
+            return None
+
+        self._profiles[user] = profile
+        return profile
+
+    def _is_fresh(self, profile: dict) -> bool:
+        fetched_at = datetime.fromisoformat(profile["fetched_at"])
+        return datetime.now() - fetched_at < timedelta(days=self.ttl_days)
+
+    def put(self, user: str, user_instance: User) -> dict:
+        profile = {
+            "display_name": user_instance.display_name,
+            "avatar": user_instance.avatar,
+            "favorites": user_instance.favorites,
+            "fetched_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        serialization.write_file(self._get_profile_path(user), profile)
+        self._profiles[user] = profile
+        return profile
+
+    def get(self, user: str, user_instance: User | None = None) -> dict:
+        """Return the profile for `user`, scraping it only when the cached one is missing or stale.
+
+        Offline, or when the scrape fails, a stale profile is used as is and a
+        missing one falls back to the username with no avatar or favorites.
+        """
+        profile = self._load(user)
+        if profile is not None and self._is_fresh(profile):
+            return profile
+
+        if user_instance is not None:
+            return self.put(user, user_instance)
+
+        if not is_offline():
+            try:
+                return self.put(user, User(user))
+            except Exception:
+                pass
+
+        return profile or {"display_name": user, "avatar": None, "favorites": None, "fetched_at": None}
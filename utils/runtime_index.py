@@ -0,0 +1,26 @@
+"""Runtime lookups shared by the runtime-filtered stats views.
+
+Movies without a runtime ("null") are only part of the unfiltered stats.
+"""
+
+from bisect import bisect_left
+
+
+class RuntimeIndex:
+    """Movie numbers of a master list sorted by runtime, so any cutoff is one bisect away."""
+
+    def __init__(self, master_list: dict):
+        timed = sorted((int(movie_data['runtime']), movie_num) for movie_num, movie_data in master_list.items() if movie_data['runtime'] != 'null')
+        self.runtimes = [runtime for runtime, _ in timed]
+        self.movie_nums = [movie_num for _, movie_num in timed]
+
+    def _start(self, min_runtime: int) -> int:
+        return bisect_left(self.runtimes, min_runtime)
+
+    def count(self, min_runtime: int) -> int:
+        """How many movies are at least `min_runtime` minutes long."""
+        return len(self.runtimes) - self._start(min_runtime)
+
+    def at_least(self, min_runtime: int) -> set:
+        """Numbers of the movies at least `min_runtime` minutes long."""
+        return set(self.movie_nums[self._start(min_runtime):])
@@ -0,0 +1,125 @@
+"""Cache file encoding.
+
+Cache files keep their `.json` names whatever they contain; the format is
+picked when writing (LETTERBOXD_CACHE_FORMAT, e.g. "json", "orjson",
+"msgpack+zstd", "json+gzip") and detected from the first bytes when reading.
+orjson, msgpack and zstandard are optional and only needed for those formats.
+"""
+
+import os
+import gzip
+import json
+from typing import Any
+from utils.file_lock import atomic_write, locked
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+FORMATS = ("json", "orjson", "msgpack")
+COMPRESSIONS = ("gzip", "zstd")
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+def parse_format(value: str | None = None) -> tuple:
+    """Split "msgpack+zstd" into ("msgpack", "zstd"); defaults to compact JSON."""
+    value = value or os.getenv("LETTERBOXD_CACHE_FORMAT", "json")
+    fmt, _, compression = value.partition("+")
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown cache format '{fmt}', expected one of {FORMATS}")
+    if compression and compression not in COMPRESSIONS:
+        raise ValueError(f"Unknown cache compression '{compression}', expected one of {COMPRESSIONS}")
+    return fmt, compression or None
+
+
+def _json_key(key) -> str:
+    # Same key conversion json.dumps applies
+    if isinstance(key, str):
+        return key
+    if key is True:
+        return "true"
+    if key is False:
+        return "false"
+    if key is None:
+        return "null"
+    if isinstance(key, float):
+        return float.__repr__(key)
+    return str(key)
+
+
+def _jsonable(obj):
+    """Make msgpack output load back exactly like the JSON file would (str keys, lists)."""
+    if isinstance(obj, dict):
+        return {_json_key(k): _jsonable(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_jsonable(v) for v in obj]
+    return obj
+
+
+def dumps(data: Any, value: str | None = None) -> bytes:
+    fmt, compression = parse_format(value)
+
+    if fmt == "msgpack":
+        if msgpack is None:
+            raise ImportError("The msgpack cache format needs the 'msgpack' package")
+        raw = msgpack.packb(_jsonable(data), use_bin_type=True)
+    elif fmt == "orjson":
+        if orjson is None:
+            raise ImportError("The orjson cache format needs the 'orjson' package")
+        raw = orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+    else:
+        raw = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    if compression == "gzip":
+        return gzip.compress(raw, compresslevel=6)
+    if compression == "zstd":
+        if zstandard is None:
+            raise ImportError("zstd cache compression needs the 'zstandard' package")
+        return zstandard.ZstdCompressor(level=10).compress(raw)
+    return raw
+
+
+def loads(raw: bytes) -> Any:
+    """Decode a cache file written in any supported format."""
+    if raw.startswith(GZIP_MAGIC):
+        raw = gzip.decompress(raw)
+    elif raw.startswith(ZSTD_MAGIC):
+        if zstandard is None:
+            raise ImportError("Reading a zstd cache file needs the 'zstandard' package")
+        raw = zstandard.ZstdDecompressor().decompressobj().decompress(raw)
+
+    first = raw.lstrip()[:1]
+    if first in (b"{", b"[", b'"') or first.isdigit() or first in (b"-", b"t", b"f", b"n"):
+        return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+    if msgpack is None:
+        raise ImportError("Reading a msgpack cache file needs the 'msgpack' package")
+    return msgpack.unpackb(raw, raw=False, strict_map_key=False)
+
+
+def read_file(path) -> Any:
+    with locked(path, shared=True):
+        with open(path, "rb") as f:
+            raw = f.read()
+    return loads(raw)
+
+
+def write_file(path, data: Any, value: str | None = None) -> bytes:
+    """Encode `data`, atomically replace `path` with it and return the written bytes."""
+    raw = dumps(data, value)
+    atomic_write(path, raw)
+    return raw
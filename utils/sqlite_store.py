@@ -0,0 +1,337 @@
+import os
+import json
+import sqlite3
+from contextlib import closing
+from datetime import date
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS films (
+    slug TEXT PRIMARY KEY,
+    name TEXT,
+    released INTEGER,
+    runtime INTEGER,
+    average_rating REAL,
+    genres TEXT,
+    country TEXT,
+    language TEXT,
+    studio TEXT,
+    popularity TEXT
+);
+CREATE TABLE IF NOT EXISTS watches (
+    user TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    slug TEXT NOT NULL,
+    name TEXT,
+    rating REAL,
+    rewatched INTEGER,
+    reviewed INTEGER,
+    liked INTEGER,
+    date TEXT,
+    PRIMARY KEY (user, year, position)
+);
+CREATE TABLE IF NOT EXISTS diary_months (
+    user TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    month TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    count INTEGER,
+    PRIMARY KEY (user, year, month)
+);
+CREATE TABLE IF NOT EXISTS diary_entries (
+    user TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    entry_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    month TEXT NOT NULL,
+    slug TEXT,
+    date TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (user, year, entry_id)
+);
+CREATE TABLE IF NOT EXISTS people (
+    slug TEXT PRIMARY KEY,
+    name TEXT
+);
+CREATE TABLE IF NOT EXISTS film_credits (
+    film_slug TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    person_slug TEXT NOT NULL,
+    role TEXT,
+    PRIMARY KEY (film_slug, kind, position)
+);
+CREATE TABLE IF NOT EXISTS blobs (
+    user TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    filename TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (user, year, filename)
+);
+CREATE INDEX IF NOT EXISTS idx_watches_user_year ON watches (user, year);
+CREATE INDEX IF NOT EXISTS idx_watches_slug ON watches (slug);
+CREATE INDEX IF NOT EXISTS idx_watches_date ON watches (date);
+CREATE INDEX IF NOT EXISTS idx_diary_user_year ON diary_entries (user, year);
+CREATE INDEX IF NOT EXISTS idx_diary_slug ON diary_entries (slug);
+CREATE INDEX IF NOT EXISTS idx_diary_date ON diary_entries (date);
+CREATE INDEX IF NOT EXISTS idx_film_credits_person ON film_credits (person_slug);
+"""
+
+DB_FILENAME = "cache.sqlite3"
+
+
+def database_version(base_cache_dir="cache") -> tuple:
+    """Changes with every write to the database (WAL mode writes land in the -wal file first)."""
+    path = os.path.join(base_cache_dir, DB_FILENAME)
+    return tuple(os.stat(p).st_mtime_ns if os.path.exists(p) else None for p in (path, f"{path}-wal"))
+
+
+def _date_key(d: dict) -> str:
+    return date(d["year"], d["month"], d["day"]).isoformat()
+
+
+def _date_dict(value: str) -> dict:
+    d = date.fromisoformat(value)
+    return {"year": d.year, "month": d.month, "day": d.day}
+
+
+class SQLiteDataAccess:
+    """SQLite cache backend with the same save_json/load_json interface as DataAccess.
+
+    The diary, master list and credits are stored in real tables (films,
+    watches, diary entries, people, film credits) indexed by slug, user, year
+    and date; every other artifact (stats, sync marks, ...) is kept as a JSON blob.
+    `load_json` rebuilds exactly what the JSON file would have contained.
+    """
+
+    def __init__(self, base_cache_dir="cache"):
+        os.makedirs(base_cache_dir, exist_ok=True)
+        self.db_path = os.path.join(base_cache_dir, DB_FILENAME)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        # One short-lived connection per call keeps this safe across threads and processes
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    @staticmethod
+    def _artifact(user: str, year: int, filename: str):
+        if filename == f"diary_data_{user}_{year}.json":
+            return "diary"
+        prefix = f"{user}_{year}_"
+        if filename.startswith(prefix) and filename.endswith(".json"):
+            name = filename[len(prefix):-len(".json")]
+            if name in ("master", "credits"):
+                return name
+        return None
+
+    # ---------------------------------------------------------
+    # save_json / load_json
+    # ---------------------------------------------------------
+    def save_json(self, user: str, year: int, filename: str, data) -> str:
+        artifact = self._artifact(user, year, filename)
+        year = int(year)
+        with closing(self._connect()) as conn, conn:
+            if artifact == "diary":
+                self._save_diary(conn, user, year, data)
+            elif artifact == "master":
+                self._save_master(conn, user, year, data)
+            elif artifact == "credits":
+                self._save_credits(conn, data)
+            else:
+                conn.execute(
+                    "INSERT OR REPLACE INTO blobs (user, year, filename, data) VALUES (?, ?, ?, ?)",
+                    (user, year, filename, json.dumps(data, ensure_ascii=False)),
+                )
+        return f"{self.db_path}#{user}/{year}/{filename}"
+
+    def load_json(self, user: str, year: int, filename: str):
+        artifact = self._artifact(user, year, filename)
+        year = int(year)
+        with closing(self._connect()) as conn:
+            if artifact == "diary":
+                return self._load_diary(conn, user, year)
+            if artifact == "master":
+                return self._load_master(conn, user, year)
+            if artifact == "credits":
+                return self._load_credits(conn, user, year)
+
+            row = conn.execute(
+                "SELECT data FROM blobs WHERE user = ? AND year = ? AND filename = ?",
+                (user, year, filename),
+            ).fetchone()
+            return json.loads(row[0]) if row else None
+
+    # ---------------------------------------------------------
+    # Diary
+    # ---------------------------------------------------------
+    def _save_diary(self, conn, user, year, data):
+        conn.execute("DELETE FROM diary_months WHERE user = ? AND year = ?", (user, year))
+        conn.execute("DELETE FROM diary_entries WHERE user = ? AND year = ?", (user, year))
+
+        position = 0
+        for month_position, (month, month_data) in enumerate(data.items()):
+            conn.execute(
+                "INSERT INTO diary_months (user, year, month, position, count) VALUES (?, ?, ?, ?, ?)",
+                (user, year, month, month_position, month_data.get("count", 0)),
+            )
+            for entry_id, entry in month_data.get("entries", {}).items():
+                conn.execute(
+                    "INSERT INTO diary_entries (user, year, entry_id, position, month, slug, date, data) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (user, year, entry_id, position, month, entry.get("slug"), _date_key(entry["date"]), json.dumps(entry, ensure_ascii=False)),
+                )
+                position += 1
+
+    def _load_diary(self, conn, user, year):
+        months = conn.execute(
+            "SELECT month, count FROM diary_months WHERE user = ? AND year = ? ORDER BY position",
+            (user, year),
+        ).fetchall()
+        if not months:
+            return None
+
+        diary = {name: {"count": count, "entries": {}} for name, count in months}
+        rows = conn.execute(
+            "SELECT month, entry_id, data FROM diary_entries WHERE user = ? AND year = ? ORDER BY position",
+            (user, year),
+        )
+        for name, entry_id, data in rows:
+            diary[name]["entries"][entry_id] = json.loads(data)
+        return diary
+
+    # ---------------------------------------------------------
+    # Master list (films + watches)
+    # ---------------------------------------------------------
+    def _save_master(self, conn, user, year, data):
+        conn.execute("DELETE FROM watches WHERE user = ? AND year = ?", (user, year))
+
+        for position, record in data.items():
+            # Films are shared by every user: a build without watcher stats keeps the ones another build stored
+            conn.execute(
+                """
+                INSERT INTO films (slug, name, released, runtime, average_rating, genres, country, language, studio, popularity)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (slug) DO UPDATE SET
+                    name = excluded.name, released = excluded.released, runtime = excluded.runtime,
+                    average_rating = excluded.average_rating, genres = excluded.genres, country = excluded.country,
+                    language = excluded.language, studio = excluded.studio,
+                    popularity = COALESCE(excluded.popularity, films.popularity)
+                """,
+                (
+                    record["slug"],
+                    record.get("name"),
+                    record.get("released"),
+                    record.get("runtime"),
+                    record.get("average rating"),
+                    json.dumps(record.get("genres", [])),
+                    json.dumps(record.get("country", [])),
+                    json.dumps(record.get("language", [])),
+                    json.dumps(record.get("studio", [])),
+                    json.dumps(record["popularity"]) if record.get("popularity") is not None else None,
+                ),
+            )
+            conn.execute(
+                "INSERT INTO watches (user, year, position, slug, name, rating, rewatched, reviewed, liked, date) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    user, year, int(position), record["slug"], record.get("name"), record.get("rating"),
+                    record.get("rewatched"), record.get("reviewed"), record.get("liked"), _date_key(record["date"]),
+                ),
+            )
+
+    def _load_master(self, conn, user, year):
+        rows = conn.execute(
+            """
+            SELECT w.position, w.name, w.slug, w.rating, w.rewatched, w.reviewed, w.liked, w.date,
+                   f.released, f.runtime, f.popularity, f.average_rating, f.genres, f.country, f.language, f.studio
+            FROM watches w JOIN films f ON f.slug = w.slug
+            WHERE w.user = ? AND w.year = ?
+            ORDER BY w.position
+            """,
+            (user, year),
+        ).fetchall()
+        if not rows:
+            return None
+
+        master = {}
+        for (position, name, slug, rating, rewatched, reviewed, liked, watched_on,
+             released, runtime, popularity, average_rating, genres, country, language, studio) in rows:
+            master[str(position)] = {
+                "name": name,
+                "slug": slug,
+                "rating": rating,
+                "rewatched": bool(rewatched),
+                "reviewed": bool(reviewed),
+                "liked": bool(liked),
+                "date": _date_dict(watched_on),
+                "released": released,
+                "runtime": runtime,
+                "popularity": json.loads(popularity) if popularity is not None else None,
+                "average rating": average_rating,
+                "genres": json.loads(genres),
+                "country": json.loads(country),
+                "language": json.loads(language),
+                "studio": json.loads(studio),
+            }
+        return master
+
+    # ---------------------------------------------------------
+    # Credits (people + film credits, shared by every user)
+    # ---------------------------------------------------------
+    def _save_credits(self, conn, data):
+        for person_slug, name in data.get("people", {}).items():
+            conn.execute("INSERT OR REPLACE INTO people (slug, name) VALUES (?, ?)", (person_slug, name))
+
+        for film_slug, film in data.get("films", {}).items():
+            conn.execute("DELETE FROM film_credits WHERE film_slug = ?", (film_slug,))
+            rows = [(film_slug, "cast", position, person_slug, role) for position, (person_slug, role) in enumerate(film["cast"])]
+            rows += [(film_slug, "director", position, person_slug, None) for position, person_slug in enumerate(film["director"])]
+            conn.executemany(
+                "INSERT INTO film_credits (film_slug, kind, position, person_slug, role) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def _load_credits(self, conn, user, year):
+        # Films in first-watch order, then each film's credits in their stored order
+        rows = conn.execute(
+            """
+            SELECT c.film_slug, c.kind, c.person_slug, c.role, p.name
+            FROM (SELECT slug, MIN(position) AS first_watch FROM watches WHERE user = ? AND year = ? GROUP BY slug) w
+            JOIN film_credits c ON c.film_slug = w.slug
+            JOIN people p ON p.slug = c.person_slug
+            ORDER BY w.first_watch, c.kind = 'director', c.position
+            """,
+            (user, year),
+        ).fetchall()
+
+        credits = {"people": {}, "films": {}}
+        for (slug,) in conn.execute(
+            "SELECT slug FROM watches WHERE user = ? AND year = ? GROUP BY slug ORDER BY MIN(position)", (user, year)
+        ):
+            credits["films"][slug] = {"cast": [], "director": []}
+        if not credits["films"]:
+            return None
+
+        for film_slug, kind, person_slug, role, name in rows:
+            credits["people"].setdefault(person_slug, name)
+            if kind == "cast":
+                credits["films"][film_slug]["cast"].append([person_slug, role])
+            else:
+                credits["films"][film_slug]["director"].append(person_slug)
+        return credits
+
+    def list_users(self) -> list:
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT DISTINCT user FROM diary_months UNION SELECT DISTINCT user FROM blobs ORDER BY 1"
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def list_years(self, user: str) -> list:
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT DISTINCT year FROM diary_months WHERE user = ? UNION SELECT DISTINCT year FROM blobs WHERE user = ? ORDER BY 1 DESC",
+                (user, user),
+            ).fetchall()
+        return [str(row[0]) for row in rows]
@@ -0,0 +1,65 @@
+"""Input hashes of pipeline stages, for skipping unchanged work.
+
+Each stage hashes everything it reads and records the hash in
+`<user>_<year>_stages.json` after writing its output. When the next run sees
+the same hash (and the output is still cached) the stage is skipped.
+"""
+
+import json
+import hashlib
+import marshal
+
+
+def content_hash(*parts) -> str:
+    """Stable sha256 of JSON-serializable values (dict order doesn't matter)."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(json.dumps(part, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class RecordDigest:
+    """Running sha256 over a sequence of records (JSON values), fed a few at a time.
+
+    Much faster than content_hash, as records are encoded with marshal instead of
+    sorted JSON, but the same record with its keys in another order hashes
+    differently. Good for spotting an unchanged prefix of a list, where a false
+    "changed" only costs recomputing it.
+    """
+
+    def __init__(self):
+        self._digest = hashlib.sha256()
+        self.count = 0
+
+    def update(self, records):
+        for record in records:
+            self._digest.update(marshal.dumps(record, 2))
+            self.count += 1
+
+    def hexdigest(self) -> str:
+        return self._digest.hexdigest()
+
+
+class StageLog:
+    """Per user/year record of the input hash each stage last ran with."""
+
+    def __init__(self, data_access, user: str, year: int):
+        self.data_access = data_access
+        self.user = user
+        self.year = year
+        self.filename = f"{user}_{year}_stages.json"
+        self._hashes = None
+
+    @property
+    def hashes(self) -> dict:
+        if self._hashes is None:
+            self._hashes = self.data_access.load_json(self.user, self.year, self.filename) or {}
+        return self._hashes
+
+    def unchanged(self, stage: str, input_hash: str) -> bool:
+        return self.hashes.get(stage) == input_hash
+
+    def record(self, stage: str, input_hash: str):
+        self.hashes[stage] = input_hash
+        self.data_access.save_json(self.user, self.year, self.filename, self.hashes)
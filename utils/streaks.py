@@ -0,0 +1,33 @@
+"""Run-length streaks over any bucketed occupancy series (days, weeks, months)."""
+
+
+def find_streaks(labels, occupied, min_length: int = 2, top: int = 3) -> dict:
+    """Find every run of consecutive occupied periods in one pass.
+
+    `labels` and `occupied` are parallel sequences in period order. Returns
+    {"streaks": {"streak N": [labels]}, "longest": {...}, "top": {...}, "current": [labels]}
+    where streaks are the runs of at least `min_length` periods, "longest" keeps
+    ties, "top" holds the `top` longest (ties in period order) and "current" is the
+    run still open at the end of the series (possibly a single period, or empty).
+    """
+    streaks = {}
+    run = []
+    for label, active in zip(labels, occupied):
+        if active:
+            run.append(label)
+            continue
+        if len(run) >= min_length:
+            streaks[f"streak {len(streaks) + 1}"] = run
+        run = []
+
+    if len(run) >= min_length:
+        streaks[f"streak {len(streaks) + 1}"] = run
+
+    longest = max((len(streak) for streak in streaks.values()), default=0)
+    return {
+        "streaks": streaks,
+        "longest": {name: streak for name, streak in streaks.items() if len(streak) == longest},
+        "top": dict(sorted(streaks.items(), key=lambda item: len(item[1]), reverse=True)[:top]),
+        "current": run,
+    }
+